@@ -15,27 +15,55 @@ def create_app():
     # Configure the application
     app.config.from_object('app.config.Config')
     
+    # Configure log levels before anything logs
+    from app.utils.log import configure_logging
+    configure_logging(app)
+    
     # Initialize extensions
-    CORS(app)
+    CORS(app, expose_headers=['X-Next-Cursor'])
     db.init_app(app)
     migrate.init_app(app, db)
     
     # Initialize API
     api = Api(app)
     
+    # Encode responses with orjson when it is installed
+    from app.utils.fastjson import output_json
+    api.representation('application/json')(output_json)
+    
     # Register blueprints and resources
-    from app.api.paddock import PaddockResource, PaddockListResource
-    from app.api.ndvi import NDVIResource
-    from app.api.weather import WeatherResource
+    from app.api.paddock import PaddockResource, PaddockListResource, PaddockImportResource
+    from app.api.ndvi import NDVIResource, NDVIAnalyticsResource, NDVITrendResource, NDVISummaryResource
+    from app.api.weather import WeatherResource, PaddockWeatherResource, PaddockWeatherBatchResource
+    from app.api.export import PaddockExportResource, NDVIExportResource
+    from app.api.tiles import PaddockTileResource, NDVITileResource
     
     # Add API resources
     api.add_resource(PaddockListResource, '/api/paddocks')
+    api.add_resource(PaddockImportResource, '/api/paddocks/import')
+    api.add_resource(PaddockExportResource, '/api/paddocks/export')
+    api.add_resource(PaddockWeatherBatchResource, '/api/paddocks/weather')
     api.add_resource(PaddockResource, '/api/paddocks/<uuid:paddock_id>')
     api.add_resource(NDVIResource, '/api/paddocks/<uuid:paddock_id>/ndvi')
+    api.add_resource(NDVIAnalyticsResource, '/api/paddocks/<uuid:paddock_id>/ndvi/analytics')
+    api.add_resource(PaddockWeatherResource, '/api/paddocks/<uuid:paddock_id>/weather')
     api.add_resource(WeatherResource, '/api/weather')
+    api.add_resource(NDVIExportResource, '/api/ndvi/export')
+    api.add_resource(NDVITrendResource, '/api/ndvi/trends')
+    api.add_resource(NDVISummaryResource, '/api/ndvi/summary')
+    api.add_resource(PaddockTileResource, '/api/paddocks/tiles/<int:z>/<int:x>/<int:y>.mvt')
+    api.add_resource(NDVITileResource, '/api/ndvi/tiles/<int:z>/<int:x>/<int:y>/<string:preset_code>/<string:image_id>')
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Create database tables if they don't exist
     with app.app_context():
         db.create_all()
+        
+        # Partitioned tables reject rows until a partition covers their date
+        from app.services.partitions import maintain_partitions
+        maintain_partitions()
     
     return app 
\ No newline at end of file
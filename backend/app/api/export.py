@@ -0,0 +1,70 @@
+import uuid
+from flask import Response, request, current_app, stream_with_context
+from flask_restful import Resource
+
+from app.api.paddock import get_request_bbox
+from app.services.export import (
+    export_ndvi_csv, export_ndvi_parquet, export_paddocks_geojson, parquet_supported
+)
+from app.utils.helpers import format_exception, parse_datetime, to_naive_utc
+
+def streaming_response(chunks, mimetype, filename):
+    """
+    Build a chunked response that keeps the request context open while it streams
+    
+    Args:
+        chunks: Generator of bytes
+        mimetype (str): Response content type
+        filename (str): Download file name
+        
+    Returns:
+        Response: Streaming response
+    """
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+class PaddockExportResource(Resource):
+    def get(self):
+        """Stream all paddocks as a GeoJSON FeatureCollection"""
+        try:
+            try:
+                bbox = get_request_bbox(request.args)
+            except ValueError as e:
+                return {"message": "Invalid bounding box", "error": str(e)}, 400
+            
+            return streaming_response(export_paddocks_geojson(bbox), 'application/geo+json', 'paddocks.geojson')
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error exporting paddocks: {error_msg}")
+            return {"message": "Failed to export paddocks", "error": str(e)}, 500
+
+class NDVIExportResource(Resource):
+    def get(self):
+        """Stream the NDVI history time series as CSV or Parquet"""
+        try:
+            try:
+                export_format = request.args.get('format', 'csv').lower()
+                if export_format not in ('csv', 'parquet'):
+                    raise ValueError("format must be csv or parquet")
+                paddock_id = request.args.get('paddock_id')
+                paddock_id = uuid.UUID(paddock_id) if paddock_id else None
+                start_date = request.args.get('start_date')
+                start_date = to_naive_utc(parse_datetime(start_date)) if start_date else None
+                end_date = request.args.get('end_date')
+                end_date = to_naive_utc(parse_datetime(end_date)) if end_date else None
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
+            if export_format == 'parquet':
+                if not parquet_supported():
+                    return {"message": "Parquet export is not available on this server"}, 501
+                chunks = export_ndvi_parquet(paddock_id, start_date, end_date)
+                return streaming_response(chunks, 'application/vnd.apache.parquet', 'ndvi_history.parquet')
+            
+            chunks = export_ndvi_csv(paddock_id, start_date, end_date)
+            return streaming_response(chunks, 'text/csv', 'ndvi_history.csv')
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error exporting NDVI history: {error_msg}")
+            return {"message": "Failed to export NDVI history", "error": str(e)}, 500
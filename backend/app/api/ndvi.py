@@ -1,15 +1,26 @@
 from flask import request, jsonify, current_app
 from flask_restful import Resource
 from datetime import datetime
+import math
+import uuid
 from sqlalchemy.exc import SQLAlchemyError
-import json
+import logging
 
 from app import db
 from app.models.paddock import Paddock
 from app.models.ndvi import NDVIHistory
 from app.schemas.ndvi import ndvi_schema, ndvi_list_schema
 from app.services.agromonitoring import AgromonitoringService
-from app.utils.helpers import format_exception, parse_datetime, get_ndvi_health_status
+from app.services.ndvi_analytics import MAX_WINDOW_DAYS, analyze, load_series, series_to_dict, trend_report
+from app.services.ndvi_cache import NDVICache
+from app.services.ndvi_summary import get_ndvi_summary
+from app.services.ndvi_tiles import get_ndvi_tile_proxy_url
+from app.utils.helpers import (
+    format_exception, parse_datetime, get_ndvi_health_status, redact_api_key, strip_api_key, to_naive_utc
+)
+from app.utils.log import lazy_json
+
+logger = logging.getLogger(__name__)
 
 class NDVIResource(Resource):
     def get(self, paddock_id):
@@ -27,78 +38,195 @@ class NDVIResource(Resource):
             start_date = parse_datetime(start_date) if start_date else None
             end_date = parse_datetime(end_date) if end_date else None
             
-            current_app.logger.info(f"Fetching NDVI data for paddock {paddock_id} (Agromonitoring ID: {paddock.agromonitoring_id})")
-            current_app.logger.info(f"Date range: {start_date} to {end_date}")
+            logger.info("Fetching NDVI data for paddock %s (Agromonitoring ID: %s)", paddock_id, paddock.agromonitoring_id)
+            logger.debug("Date range: %s to %s", start_date, end_date)
             
-            # Initialize Agromonitoring service
+            # Serve scenes from the NDVI cache, fetching only missing dates upstream
             agro_service = AgromonitoringService()
+            ndvi_cache = NDVICache(agro_service)
+            scenes = ndvi_cache.get_scenes(paddock, start_date, end_date)
             
-            # Get satellite imagery metadata
-            images = agro_service.get_satellite_imagery(
-                paddock.agromonitoring_id,
-                start_date,
-                end_date
-            )
-            
-            current_app.logger.info(f"Retrieved {len(images)} satellite images")
-            current_app.logger.info(f"Satellite images: {json.dumps(images, indent=2)}")
+            logger.debug("Retrieved %d satellite scenes", len(scenes))
             
-            if not images:
+            if not scenes:
                 return {"message": "No satellite imagery available for this paddock"}, 404
             
             # Get the latest image for current NDVI display
-            latest_image = next((img for img in images if img.get('image', {}).get('ndvi')), None)
+            images = [scene for scene in scenes if scene.image_url]
             
-            if not latest_image:
+            if not images:
                 return {"message": "No NDVI data available for this paddock"}, 404
             
-            current_app.logger.info(f"Latest image: {json.dumps(latest_image, indent=2)}")
+            latest_image = images[0]
+            logger.debug("Latest image: %s (%s)", latest_image.date, latest_image.satellite)
             
-            # Get NDVI data for the latest image
-            ndvi_url = latest_image['image']['ndvi']
-            current_app.logger.info(f"NDVI URL: {ndvi_url}")
+            # Get NDVI statistics for the latest image
+            statistics = ndvi_cache.get_statistics(paddock, latest_image)
             
-            ndvi_data = agro_service.get_ndvi_data(paddock.agromonitoring_id, ndvi_url)
-            current_app.logger.info(f"NDVI data: {json.dumps(ndvi_data, indent=2)}")
+            # Historical NDVI data, oldest first
+            ndvi_history = [
+                scene.to_history_entry()
+                for scene in reversed(scenes) if scene.ndvi_value is not None
+            ]
             
-            # Get historical NDVI data
-            ndvi_history = agro_service.get_ndvi_history(
-                paddock.agromonitoring_id,
-                start_date,
-                end_date
-            )
-            
-            current_app.logger.info(f"Retrieved {len(ndvi_history)} historical NDVI records")
+            logger.debug("Retrieved %d historical NDVI records", len(ndvi_history))
             
             # Prepare the response
             response = {
                 'current': {
-                    'date': latest_image.get('date'),
-                    'statistics': ndvi_data.get('statistics', {}),
-                    'tile_url': ndvi_data.get('tile_url'),
-                    'image_url': ndvi_data.get('image_url'),
-                    'clouds': latest_image.get('clouds'),
-                    'coverage': latest_image.get('coverage'),
-                    'satellite': latest_image.get('type'),
-                    'sun': latest_image.get('sun', {})
+                    'date': latest_image.date.isoformat(),
+                    'statistics': statistics,
+                    'tile_url': get_ndvi_tile_proxy_url(*agro_service.parse_ndvi_url(latest_image.image_url)),
+                    'image_url': strip_api_key(latest_image.image_url),
+                    'clouds': latest_image.clouds,
+                    'coverage': latest_image.coverage,
+                    'satellite': latest_image.satellite,
+                    'sun': latest_image.sun or {}
                 },
                 'available_dates': [
                     {
-                        'date': img.get('date'),
-                        'clouds': img.get('clouds'),
-                        'coverage': img.get('coverage'),
-                        'satellite': img.get('type'),
-                        'urls': img.get('image', {})
+                        'date': img.date.isoformat(),
+                        'clouds': img.clouds,
+                        'coverage': img.coverage,
+                        'satellite': img.satellite,
+                        'urls': {
+                            name: strip_api_key(url) for name, url in (img.image_urls or {}).items()
+                        }
                     }
-                    for img in images if img.get('image', {}).get('ndvi')
+                    for img in images
                 ],
                 'history': ndvi_history
             }
             
-            current_app.logger.info(f"Final response: {json.dumps(response, indent=2)}")
+            logger.debug("Final response: %s", lazy_json(response))
             return response, 200
             
         except Exception as e:
-            error_msg = format_exception(e)
+            error_msg = redact_api_key(format_exception(e))
             current_app.logger.error(f"Error retrieving NDVI data: {error_msg}")
-            return {"message": "Failed to retrieve NDVI data", "error": str(e)}, 500 
\ No newline at end of file
+            return {"message": "Failed to retrieve NDVI data", "error": redact_api_key(str(e))}, 500
+
+def _get_number(args, name):
+    value = float(args[name]) if args.get(name) is not None else None
+    if value is not None and not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    return value
+
+def get_max_clouds(args):
+    """
+    Get the cloud cover cut-off from query arguments
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        float: Maximum cloud cover percentage, or None if not given
+        
+    Raises:
+        ValueError: If max_clouds is malformed or not between 0 and 100
+    """
+    max_clouds = _get_number(args, 'max_clouds')
+    if max_clouds is not None and not 0 <= max_clouds <= 100:
+        raise ValueError("max_clouds must be between 0 and 100")
+    return max_clouds
+
+def get_analytics_args(args):
+    """
+    Get the date range and analytics settings from query arguments
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        dict: start_date, end_date, smoothing_days, rolling_days and max_clouds
+        
+    Raises:
+        ValueError: If a parameter is malformed or out of range
+    """
+    parsed = {
+        'start_date': to_naive_utc(parse_datetime(args.get('start_date'))),
+        'end_date': to_naive_utc(parse_datetime(args.get('end_date'))),
+        'max_clouds': get_max_clouds(args)
+    }
+    for name in ('smoothing_days', 'rolling_days'):
+        parsed[name] = _get_number(args, name)
+        if parsed[name] is not None and not 0 < parsed[name] <= MAX_WINDOW_DAYS:
+            raise ValueError(f"{name} must be greater than 0 and at most {MAX_WINDOW_DAYS}")
+    return parsed
+
+class NDVIAnalyticsResource(Resource):
+    def get(self, paddock_id):
+        """Get the analysed NDVI time series of a paddock from cached history"""
+        try:
+            if not db.session.query(Paddock.id).filter(Paddock.id == paddock_id).first():
+                return {"message": f"Paddock with ID {paddock_id} not found"}, 404
+            
+            try:
+                args = get_analytics_args(request.args)
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
+            series = load_series([paddock_id], args.pop('start_date'), args.pop('end_date'))
+            analysis = analyze(series, **args)
+            report = trend_report(series, analysis)
+            
+            return {
+                'paddock_id': str(paddock_id),
+                'summary': report[0] if report else None,
+                'series': series_to_dict(series, analysis)
+            }, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error analysing NDVI data for paddock {paddock_id}: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error analysing NDVI data for paddock {paddock_id}: {error_msg}")
+            return {"message": "Failed to analyse NDVI data", "error": str(e)}, 500
+
+class NDVITrendResource(Resource):
+    def get(self):
+        """Get the NDVI trend of every paddock, or of paddock_ids=a,b,c, from cached history"""
+        try:
+            try:
+                args = get_analytics_args(request.args)
+                paddock_ids = None
+                if request.args.get('paddock_ids'):
+                    paddock_ids = [uuid.UUID(value.strip()) for value in request.args['paddock_ids'].split(',') if value.strip()]
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
+            series = load_series(paddock_ids, args.pop('start_date'), args.pop('end_date'))
+            report = trend_report(series, analyze(series, **args))
+            
+            return {'paddocks': report}, 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error building NDVI trends: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error building NDVI trends: {error_msg}")
+            return {"message": "Failed to build NDVI trends", "error": str(e)}, 500
+
+class NDVISummaryResource(Resource):
+    def get(self):
+        """Get the latest NDVI, trend and health of every paddock from cached history"""
+        try:
+            try:
+                max_clouds = get_max_clouds(request.args)
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
+            return get_ndvi_summary(max_clouds), 200
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error building NDVI summary: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error building NDVI summary: {error_msg}")
+            return {"message": "Failed to build NDVI summary", "error": str(e)}, 500
\ No newline at end of file
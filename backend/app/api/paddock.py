@@ -2,21 +2,188 @@ from flask import request, jsonify, current_app
 from flask_restful import Resource
 from marshmallow import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only
 import uuid
+import zipfile
 
 from app import db
 from app.models.paddock import Paddock
-from app.schemas.paddock import paddock_schema, paddocks_schema
+from app.models.paddock_geometry import PaddockGeometryLevel
+from app.schemas.paddock import PaddockSchema, paddock_schema, paddocks_schema
 from app.services.agromonitoring import AgromonitoringService
-from app.services.geometry import calculate_area
+from app.services.geometry import calculate_area, parse_bbox, same_geometry, select_geometry_level, viewport_to_bbox
+from app.services.ndvi_cache import NDVICache
+from app.services.paddock_import import PaddockImporter, read_feature_collection, read_shapefile_zip, start_registration
+from app.services.paddock_tiles import invalidate_paddock_tiles
+from app.services.spatial_index import filter_paddocks_by_bbox
+from app.utils.fastjson import RawJSON
 from app.utils.helpers import format_exception
+from app.utils.pagination import paginate_keyset
+
+def get_request_fields(args):
+    """
+    Get the paddock fields requested with fields=a,b,c
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        tuple: Field names, or None to return every field
+        
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not args.get('fields'):
+        return None
+    
+    fields = tuple(name.strip() for name in args['fields'].split(',') if name.strip())
+    unknown = set(fields) - set(PaddockSchema().fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def get_request_bbox(args):
+    """
+    Get the bounding box requested by a bbox or zoom+viewport query
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        tuple: (min_lon, min_lat, max_lon, max_lat), or None if no area was requested
+        
+    Raises:
+        ValueError: If the parameters are malformed
+    """
+    if args.get('bbox'):
+        return parse_bbox(args['bbox'])
+    
+    if args.get('lon') is not None or args.get('lat') is not None:
+        try:
+            lon = float(args['lon'])
+            lat = float(args['lat'])
+            zoom = float(args['zoom'])
+            width = int(args['width'])
+            height = int(args['height'])
+        except KeyError as e:
+            raise ValueError(f"viewport requires zoom, lon, lat, width and height (missing {e.args[0]})")
+        return viewport_to_bbox(lon, lat, zoom, width, height)
+    
+    return None
+
+def get_request_geometry_level(args):
+    """
+    Get the geometry level of detail requested by zoom= or tolerance=
+    
+    Args:
+        args: Request query arguments
+        
+    Returns:
+        int: Level to serve, 0 for the full geometry
+        
+    Raises:
+        ValueError: If the parameters are malformed
+    """
+    zoom = float(args['zoom']) if args.get('zoom') is not None else None
+    tolerance = float(args['tolerance']) if args.get('tolerance') is not None else None
+    return select_geometry_level(current_app.config['GEOMETRY_LOD_TOLERANCES'], zoom, tolerance)
+
+def get_load_columns(fields, level):
+    """
+    Get the paddock columns a dump needs to load
+    
+    Args:
+        fields (tuple): Requested fields, or None for every field
+        level (int): Geometry level of detail
+        
+    Returns:
+        set: Column names, or None to load every column
+    """
+    if not fields and not level:
+        return None
+    columns = set(fields or PaddockSchema().fields) | {'id', 'created_at'}
+    for name, derived_from in PaddockSchema.COLUMNS.items():
+        if name in columns:
+            columns.remove(name)
+            columns.update(derived_from)
+    if level:
+        # Simplified geometries come from paddock_geometry_levels instead
+        columns.discard('geometry')
+    return columns
+
+def dump_paddocks(paddocks, fields=None, level=0):
+    """
+    Serialize paddocks, swapping in precomputed simplified geometries
+    
+    Args:
+        paddocks (list): Paddock instances
+        fields (tuple, optional): Fields to include, None for every field
+        level (int, optional): Geometry level of detail, 0 for the full geometry
+        
+    Returns:
+        list: Serialized paddocks
+    """
+    with_geometry = not fields or 'geometry' in fields
+    if not level or not with_geometry:
+        schema = PaddockSchema(many=True, only=fields) if fields else paddocks_schema
+        return schema.dump(paddocks)
+    
+    only = [name for name in (fields or PaddockSchema().fields) if name != 'geometry']
+    data = PaddockSchema(many=True, only=only).dump(paddocks)
+    
+    simplified = dict(
+        db.session.query(PaddockGeometryLevel.paddock_id, PaddockGeometryLevel.geometry).filter(
+            PaddockGeometryLevel.paddock_id.in_([paddock.id for paddock in paddocks]),
+            PaddockGeometryLevel.level == level
+        )
+    )
+    for paddock, item in zip(paddocks, data):
+        # Fall back to the full geometry if no simplification was stored
+        geometry = simplified.get(paddock.id) or paddock.geometry
+        item['geometry'] = RawJSON(geometry)
+    return data
 
 class PaddockListResource(Resource):
     def get(self):
-        """Get all paddocks"""
+        """Get a page of paddocks, optionally limited to a bounding box or map viewport"""
         try:
-            paddocks = Paddock.query.all()
-            return paddocks_schema.dump(paddocks), 200
+            try:
+                bbox = get_request_bbox(request.args)
+            except ValueError as e:
+                return {"message": "Invalid bounding box", "error": str(e)}, 400
+            
+            try:
+                limit = min(
+                    int(request.args.get('limit', current_app.config['PADDOCK_PAGE_SIZE'])),
+                    current_app.config['PADDOCK_PAGE_MAX_SIZE']
+                )
+                if limit < 1:
+                    raise ValueError("limit must be positive")
+                fields = get_request_fields(request.args)
+                level = get_request_geometry_level(request.args)
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
+            query = Paddock.query
+            if bbox:
+                query = filter_paddocks_by_bbox(query, bbox)
+            
+            # Only load the columns the response needs
+            columns = get_load_columns(fields, level)
+            if columns:
+                query = query.options(load_only(*[getattr(Paddock, name) for name in columns]))
+            
+            try:
+                paddocks, next_cursor = paginate_keyset(
+                    query, Paddock.created_at, Paddock.id, limit, request.args.get('cursor')
+                )
+            except ValueError as e:
+                return {"message": "Invalid cursor", "error": str(e)}, 400
+            
+            headers = {}
+            if next_cursor:
+                headers['X-Next-Cursor'] = next_cursor
+            return dump_paddocks(paddocks, fields, level), 200, headers
         except Exception as e:
             error_msg = format_exception(e)
             current_app.logger.error(f"Error fetching paddocks: {error_msg}")
@@ -52,6 +219,7 @@ class PaddockListResource(Resource):
             # Save to database
             db.session.add(paddock)
             db.session.commit()
+            invalidate_paddock_tiles(paddock.geometry)
             
             return paddock_schema.dump(paddock), 201
         except ValidationError as e:
@@ -66,14 +234,71 @@ class PaddockListResource(Resource):
             current_app.logger.error(f"Error creating paddock: {error_msg}")
             return {"message": "Failed to create paddock", "error": str(e)}, 500
 
+class PaddockImportResource(Resource):
+    def post(self):
+        """Import paddocks from a GeoJSON FeatureCollection or a zipped shapefile"""
+        try:
+            # Accept a JSON body or an uploaded .geojson/.json/.zip file
+            try:
+                upload = request.files.get('file')
+                if upload is not None:
+                    if upload.filename.lower().endswith('.zip'):
+                        features = read_shapefile_zip(upload.stream)
+                    else:
+                        features = read_feature_collection(upload.read())
+                else:
+                    json_data = request.get_json(silent=True)
+                    if not json_data:
+                        return {"message": "No input data provided"}, 400
+                    features = read_feature_collection(json_data)
+            except (ValueError, zipfile.BadZipFile) as e:
+                return {"message": "Invalid import file", "error": str(e)}, 400
+            
+            if not features:
+                return {"message": "No features to import"}, 400
+            
+            register = request.args.get('register', 'true').lower() not in ('0', 'false', 'no')
+            result = PaddockImporter().run(features, register=False, name_property=request.args.get('name_property'))
+            if not result['created']:
+                return result, 400
+            if not register:
+                return result, 201
+            
+            # Registration waits on the shared rate limit, which for a large farm takes far
+            # longer than a request may, so it runs in the background after the insert
+            created = [status['id'] for status in result['features'] if status.get('status') == 'created']
+            start_registration(
+                current_app._get_current_object(),
+                [uuid.UUID(paddock_id) for paddock_id in created],
+                current_app.config['PADDOCK_IMPORT_RATE_LIMIT_WAIT']
+            )
+            result['registration'] = 'queued'
+            return result, 202
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error importing paddocks: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error importing paddocks: {error_msg}")
+            return {"message": "Failed to import paddocks", "error": str(e)}, 500
+
 class PaddockResource(Resource):
     def get(self, paddock_id):
         """Get a specific paddock by ID"""
         try:
+            try:
+                level = get_request_geometry_level(request.args)
+            except ValueError as e:
+                return {"message": "Invalid query parameters", "error": str(e)}, 400
+            
             paddock = Paddock.query.get(paddock_id)
             if not paddock:
                 return {"message": f"Paddock with ID {paddock_id} not found"}, 404
-                
+            
+            if level:
+                return dump_paddocks([paddock], level=level)[0], 200
             return paddock_schema.dump(paddock), 200
         except Exception as e:
             error_msg = format_exception(e)
@@ -97,13 +322,17 @@ class PaddockResource(Resource):
             data = paddock_schema.load(json_data)
             
             # Update paddock attributes
+            name_changed = paddock.name != data["name"]
             paddock.name = data["name"]
             
             # If geometry changed, update Agromonitoring API
             geometry_changed = False
-            if data.get("geometry") and paddock.geometry != json_data.get("geometry"):
+            old_geometry = paddock.geometry
+            if data.get("geometry") and not same_geometry(paddock.geometry, data["geometry"]):
                 paddock.geometry = data["geometry"]
                 paddock.area = calculate_area(paddock.geometry)
+                paddock.refresh_location()
+                paddock.refresh_geometry_levels()
                 geometry_changed = True
             
             # Update polygon in Agromonitoring API if needed
@@ -117,10 +346,19 @@ class PaddockResource(Resource):
                 except Exception as e:
                     error_msg = format_exception(e)
                     current_app.logger.error(f"Error updating polygon in Agromonitoring API: {error_msg}")
+                
+                # Cached scenes belong to the old polygon
+                NDVICache(agro_service).invalidate(paddock)
             
             # Save to database
             db.session.commit()
             
+            # Tiles show the name as well as the outline
+            if geometry_changed:
+                invalidate_paddock_tiles(old_geometry, paddock.geometry)
+            elif name_changed:
+                invalidate_paddock_tiles(paddock.geometry)
+            
             return paddock_schema.dump(paddock), 200
         except ValidationError as e:
             return {"message": "Validation error", "errors": e.messages}, 400
@@ -151,8 +389,10 @@ class PaddockResource(Resource):
                     current_app.logger.error(f"Error deleting polygon from Agromonitoring API: {error_msg}")
             
             # Delete from database
+            geometry = paddock.geometry
             db.session.delete(paddock)
             db.session.commit()
+            invalidate_paddock_tiles(geometry)
             
             return {"message": "Paddock deleted successfully"}, 200
         except SQLAlchemyError as e:
@@ -0,0 +1,69 @@
+import hashlib
+from flask import Response, current_app, request
+from flask_restful import Resource
+from requests.exceptions import HTTPError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.services.ndvi_tiles import get_ndvi_tile
+from app.services.paddock_tiles import get_paddock_tile
+from app.services.ratelimit import RateLimitExceeded
+from app.utils.helpers import format_exception, redact_api_key
+
+MAX_TILE_ZOOM = 22
+
+class PaddockTileResource(Resource):
+    def get(self, z, x, y):
+        """Get paddock boundaries as a Mapbox Vector Tile"""
+        try:
+            if z > MAX_TILE_ZOOM or x >= 2 ** z or y >= 2 ** z:
+                return {"message": f"Tile {z}/{x}/{y} does not exist"}, 404
+            
+            tile = get_paddock_tile(z, x, y)
+            
+            response = Response(tile, mimetype='application/vnd.mapbox-vector-tile')
+            response.headers['Cache-Control'] = f"public, max-age={current_app.config['PADDOCK_TILE_MAX_AGE']}"
+            return response
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error rendering paddock tile {z}/{x}/{y}: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error rendering paddock tile {z}/{x}/{y}: {error_msg}")
+            return {"message": "Failed to render paddock tile", "error": str(e)}, 500
+
+class NDVITileResource(Resource):
+    def get(self, z, x, y, preset_code, image_id):
+        """Get an NDVI raster tile through the caching proxy"""
+        try:
+            if z > MAX_TILE_ZOOM or x >= 2 ** z or y >= 2 ** z:
+                return {"message": f"Tile {z}/{x}/{y} does not exist"}, 404
+            
+            try:
+                tile = get_ndvi_tile(z, x, y, preset_code, image_id)
+            except ValueError as e:
+                return {"message": "Invalid tile request", "error": str(e)}, 400
+            
+            # Tiles are immutable, so a content hash is a strong validator for the lifetime of the URL
+            response = Response(tile, mimetype='image/png')
+            response.set_etag(hashlib.sha1(tile).hexdigest())
+            response.headers['Cache-Control'] = f"public, max-age={current_app.config['NDVI_TILE_MAX_AGE']}, immutable"
+            return response.make_conditional(request)
+        except RateLimitExceeded:
+            return {"message": "Agromonitoring API rate limit exceeded, try again later"}, 429
+        except HTTPError as e:
+            # Upstream error messages carry the request URL and with it the API key,
+            # so clients only get the status code
+            status = e.response.status_code if e.response is not None else 502
+            error_msg = redact_api_key(format_exception(e))
+            current_app.logger.error(f"Error fetching NDVI tile {z}/{x}/{y}/{preset_code}/{image_id}: {error_msg}")
+            return {
+                "message": "Failed to fetch NDVI tile",
+                "error": f"Agromonitoring returned {status}"
+            }, 404 if status == 404 else 502
+        except Exception as e:
+            error_msg = redact_api_key(format_exception(e))
+            current_app.logger.error(f"Error fetching NDVI tile {z}/{x}/{y}/{preset_code}/{image_id}: {error_msg}")
+            return {"message": "Failed to fetch NDVI tile"}, 500
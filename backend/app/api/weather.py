@@ -1,13 +1,12 @@
+import uuid
 from flask import request, jsonify, current_app
 from flask_restful import Resource
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
 
 from app import db
-from app.models.weather import WeatherData
 from app.schemas.weather import weather_schema
-from app.services.agromonitoring import AgromonitoringService
-from app.services.geometry import get_centroid
+from app.models.paddock import Paddock
+from app.services.weather_cache import WeatherCache
 from app.utils.helpers import format_exception
 
 class WeatherResource(Resource):
@@ -28,49 +27,113 @@ class WeatherResource(Resource):
             except ValueError:
                 return {"message": "Invalid coordinates format"}, 400
             
-            # Check for existing weather data in the last hour
-            now = datetime.utcnow()
-            one_hour_ago = datetime(now.year, now.month, now.day, now.hour - 1)
+            if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+                return {"message": "Coordinates out of range"}, 400
             
-            existing_weather = WeatherData.query.filter(
-                WeatherData.date >= one_hour_ago
-            ).order_by(WeatherData.date.desc()).first()
+            # Serve from the grid cell cache, fetching upstream on a miss
+            weather_record = WeatherCache().get(lat, lon)
             
-            # If recent data exists, return it
-            if existing_weather:
-                return weather_schema.dump(existing_weather), 200
+            if not weather_record:
+                return {"message": "Failed to retrieve weather data"}, 500
             
-            # Otherwise, fetch from Agromonitoring API
-            agro_service = AgromonitoringService()
-            weather_data = agro_service.get_weather(lat, lon)
+            return weather_schema.dump(weather_record), 200
             
-            if not weather_data:
-                return {"message": "Failed to retrieve weather data"}, 500
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error retrieving weather data: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error retrieving weather data: {error_msg}")
+            return {"message": "Failed to retrieve weather data", "error": str(e)}, 500
+
+class PaddockWeatherResource(Resource):
+    def get(self, paddock_id):
+        """Get weather data at the centroid of a paddock"""
+        try:
+            # Read only the stored centroid, leaving the geometry unparsed
+            location = db.session.query(Paddock.centroid_lat, Paddock.centroid_lon).filter(
+                Paddock.id == paddock_id
+            ).first()
+            if not location:
+                return {"message": f"Paddock with ID {paddock_id} not found"}, 404
             
-            # Extract relevant data
-            temperature = weather_data.get('main', {}).get('temp')
-            rainfall = weather_data.get('rain', {}).get('1h', 0)
+            lat, lon = location
+            if lat is None or lon is None:
+                # Rows created before the location columns were added
+                paddock = db.session.get(Paddock, paddock_id)
+                lon, lat = paddock.get_centroid()
+                db.session.commit()
             
-            # Create new weather record
-            weather_record = WeatherData(
-                date=datetime.utcnow(),
-                temperature=temperature,
-                rainfall=rainfall,
-                forecast=weather_data
-            )
+            weather_record = WeatherCache().get(lat, lon)
             
-            # Save to database
-            db.session.add(weather_record)
-            db.session.commit()
+            if not weather_record:
+                return {"message": "Failed to retrieve weather data"}, 500
             
             return weather_schema.dump(weather_record), 200
             
         except SQLAlchemyError as e:
             db.session.rollback()
             error_msg = format_exception(e)
-            current_app.logger.error(f"Database error retrieving weather data: {error_msg}")
+            current_app.logger.error(f"Database error retrieving weather data for paddock {paddock_id}: {error_msg}")
             return {"message": "Database error", "error": str(e)}, 500
         except Exception as e:
             error_msg = format_exception(e)
-            current_app.logger.error(f"Error retrieving weather data: {error_msg}")
-            return {"message": "Failed to retrieve weather data", "error": str(e)}, 500 
\ No newline at end of file
+            current_app.logger.error(f"Error retrieving weather data for paddock {paddock_id}: {error_msg}")
+            return {"message": "Failed to retrieve weather data", "error": str(e)}, 500
+
+class PaddockWeatherBatchResource(Resource):
+    def post(self):
+        """Get weather data for many paddocks in one request"""
+        try:
+            json_data = request.get_json(silent=True)
+            if not json_data or not isinstance(json_data.get('paddock_ids'), list):
+                return {"message": "paddock_ids list is required"}, 400
+            
+            try:
+                paddock_ids = list(dict.fromkeys(uuid.UUID(str(value)) for value in json_data['paddock_ids']))
+            except ValueError as e:
+                return {"message": "Invalid paddock ID", "error": str(e)}, 400
+            
+            max_paddocks = current_app.config['WEATHER_BATCH_MAX_PADDOCKS']
+            if not paddock_ids or len(paddock_ids) > max_paddocks:
+                return {"message": f"Between 1 and {max_paddocks} paddock IDs are required"}, 400
+            
+            # Stored centroids only, no geometry is loaded or parsed
+            locations = {
+                row.id: (row.centroid_lat, row.centroid_lon)
+                for row in db.session.query(Paddock.id, Paddock.centroid_lat, Paddock.centroid_lon).filter(
+                    Paddock.id.in_(paddock_ids)
+                )
+            }
+            stale = [paddock_id for paddock_id, (lat, lon) in locations.items() if lat is None or lon is None]
+            if stale:
+                # Rows created before the location columns were added
+                for paddock in Paddock.query.filter(Paddock.id.in_(stale)):
+                    lon, lat = paddock.get_centroid()
+                    locations[paddock.id] = (lat, lon)
+                db.session.commit()
+            
+            found = [paddock_id for paddock_id in paddock_ids if paddock_id in locations]
+            cells, records = WeatherCache().get_many([locations[paddock_id] for paddock_id in found])
+            
+            # Paddocks point at their grid cell so shared weather is sent once
+            return {
+                "paddocks": {str(paddock_id): grid_cell for paddock_id, grid_cell in zip(found, cells)},
+                "cells": {
+                    grid_cell: weather_schema.dump(record) if record else None
+                    for grid_cell, record in records.items()
+                },
+                "not_found": [str(paddock_id) for paddock_id in paddock_ids if paddock_id not in locations]
+            }, 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Database error retrieving batch weather data: {error_msg}")
+            return {"message": "Database error", "error": str(e)}, 500
+        except Exception as e:
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error retrieving batch weather data: {error_msg}")
+            return {"message": "Failed to retrieve weather data", "error": str(e)}, 500
\ No newline at end of file
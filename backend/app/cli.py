@@ -0,0 +1,102 @@
+import zipfile
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, update
+
+from app import db
+
+from app.models.paddock import Paddock
+from app.services.geometry import calculate_areas
+from app.services.ndvi_ingest import run_ingestion
+from app.services.paddock_import import PaddockImporter, read_feature_collection, read_shapefile_zip
+from app.services.partitions import maintain_partitions
+from app.services.retention import RetentionJob
+
+ndvi_cli = AppGroup('ndvi', help='NDVI data commands')
+paddocks_cli = AppGroup('paddocks', help='Paddock commands')
+data_cli = AppGroup('data', help='Time-series storage commands')
+
+@ndvi_cli.command('ingest')
+@click.option('--paddock', 'paddock_ids', multiple=True, type=click.UUID, help='Only ingest this paddock (repeatable)')
+@click.option('--lookback-days', type=int, default=None, help='History to fetch for paddocks never synced')
+@click.option('--workers', type=int, default=None, help='Paddocks processed concurrently')
+def ingest(paddock_ids, lookback_days, workers):
+    """Fetch new NDVI scenes and statistics for registered paddocks"""
+    summary = run_ingestion(list(paddock_ids) or None, lookback_days, workers)
+    if summary is None:
+        raise click.ClickException("NDVI ingestion is already running")
+    click.echo(f"Synced {summary['synced']}, skipped {summary['skipped']}, failed {summary['failed']}")
+    click.echo(
+        f"Scenes inserted {summary['scenes_inserted']}, updated {summary['scenes_updated']}, "
+        f"unchanged {summary['scenes_unchanged']}"
+    )
+
+@paddocks_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--register/--no-register', default=True, help='Register the new paddocks with Agromonitoring')
+@click.option('--name-property', default=None, help='Feature property holding the paddock name')
+def import_paddocks(path, register, name_property):
+    """Import paddocks from a GeoJSON FeatureCollection or a zipped shapefile"""
+    try:
+        with open(path, 'rb') as f:
+            features = read_shapefile_zip(f) if path.lower().endswith('.zip') else read_feature_collection(f.read())
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise click.ClickException(str(e))
+    
+    result = PaddockImporter().run(features, register, name_property)
+    for status in result['features']:
+        if status['status'] == 'invalid':
+            click.echo(f"Feature {status['index']}: {status['error']}", err=True)
+        elif status.get('registration_error'):
+            click.echo(f"Feature {status['index']} ({status['name']}): registration failed: {status['registration_error']}", err=True)
+    click.echo(
+        f"Created {result['created']}, invalid {result['invalid']}, "
+        f"registered {result['registered']}, registration failed {result['registration_failed']}"
+    )
+
+@paddocks_cli.command('register')
+def register_paddocks():
+    """Register paddocks that have no Agromonitoring polygon yet"""
+    paddocks = Paddock.query.filter(Paddock.agromonitoring_id.is_(None)).all()
+    rows = [{'id': paddock.id, 'name': paddock.name, 'geometry': paddock.geometry} for paddock in paddocks]
+    results = PaddockImporter().register_paddocks(rows)
+    
+    failed = 0
+    for row, (_, error) in zip(rows, results):
+        if error:
+            failed += 1
+            click.echo(f"Paddock {row['id']} ({row['name']}): registration failed: {error}", err=True)
+    click.echo(f"Registered {len(rows) - failed}, failed {failed}")
+
+@paddocks_cli.command('recalculate-areas')
+@click.option('--batch-size', type=int, default=1000, help='Paddocks per batch')
+def recalculate_areas(batch_size):
+    """Recalculate the stored area of every paddock"""
+    updated = 0
+    result = db.session.execute(select(Paddock.id, Paddock.geometry).execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        areas = calculate_areas([row.geometry for row in rows])
+        updates = [{'id': row.id, 'area': float(area)} for row, area in zip(rows, areas)]
+        db.session.execute(update(Paddock), updates)
+        updated += len(updates)
+    db.session.commit()
+    click.echo(f"Recalculated {updated} paddock areas")
+
+@data_cli.command('partitions')
+@click.option('--months-ahead', type=int, default=None, help='Months of partitions to create in advance')
+def create_partitions(months_ahead):
+    """Create upcoming monthly partitions (PostgreSQL only)"""
+    created = maintain_partitions(months_ahead)
+    click.echo(f"Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ''))
+
+@data_cli.command('retention')
+def apply_retention():
+    """Downsample old weather readings and clear old raw payloads"""
+    summary = RetentionJob().run()
+    for step, count in summary.items():
+        click.echo(f"{step}: {count}")
+
+def register_commands(app):
+    app.cli.add_command(ndvi_cli)
+    app.cli.add_command(paddocks_cli)
+    app.cli.add_command(data_cli)
@@ -1,10 +1,15 @@
 import os
+import tempfile
 
 class Config:
     # Flask configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev_key_change_in_production')
     DEBUG = os.environ.get('FLASK_DEBUG', '1') == '1'
     
+    # Address of the development server started by run.py; gunicorn.conf.py reads the same variables
+    HOST = os.environ.get('HOST', '0.0.0.0')
+    PORT = int(os.environ.get('PORT', 5001))
+    
     # Database configuration
     POSTGRES_USER = os.environ.get('POSTGRES_USER', 'smartfarm')
     POSTGRES_PASSWORD = os.environ.get('POSTGRES_PASSWORD', 'dev_password')
@@ -15,6 +20,115 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Logging: app-wide level, per-module overrides such as 'app.api.ndvi=DEBUG,app.services.agromonitoring=WARNING',
+    # and the size limits applied to payloads logged with lazy_json
+    LOG_LEVEL = os.environ.get('LOG_LEVEL')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    LOG_PAYLOAD_MAX_CHARS = int(os.environ.get('LOG_PAYLOAD_MAX_CHARS', 2000))
+    LOG_PAYLOAD_SAMPLE_ITEMS = int(os.environ.get('LOG_PAYLOAD_SAMPLE_ITEMS', 5))
+    
+    # Response JSON encoder: 'auto' uses orjson when installed, 'json' forces the standard library
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')
+    
+    # Paddock list pagination
+    PADDOCK_PAGE_SIZE = int(os.environ.get('PADDOCK_PAGE_SIZE', 500))
+    PADDOCK_PAGE_MAX_SIZE = int(os.environ.get('PADDOCK_PAGE_MAX_SIZE', 1000))
+    
+    # Bulk paddock import: rows per INSERT batch and concurrent Agromonitoring registrations
+    PADDOCK_IMPORT_BATCH_SIZE = int(os.environ.get('PADDOCK_IMPORT_BATCH_SIZE', 500))
+    PADDOCK_IMPORT_CONCURRENCY = int(os.environ.get('PADDOCK_IMPORT_CONCURRENCY', 4))
+    PADDOCK_IMPORT_RATE_LIMIT_WAIT = float(os.environ.get('PADDOCK_IMPORT_RATE_LIMIT_WAIT', 120))  # Per background registration after an API import
+    
+    # Rows per INSERT ... ON CONFLICT statement when storing NDVI scenes and weather
+    UPSERT_BATCH_SIZE = int(os.environ.get('UPSERT_BATCH_SIZE', 500))
+    
+    # Geometry simplification tolerances in degrees, one per level of detail
+    GEOMETRY_LOD_TOLERANCES = [
+        float(tolerance)
+        for tolerance in os.environ.get('GEOMETRY_LOD_TOLERANCES', '0.00005,0.0002,0.001,0.005').split(',')
+    ]
+    
+    # Paddock vector tiles, cached on disk until a paddock in the tile changes
+    PADDOCK_TILE_CACHE_DIR = os.environ.get(
+        'PADDOCK_TILE_CACHE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tiles')
+    )
+    PADDOCK_TILE_MAX_AGE = int(os.environ.get('PADDOCK_TILE_MAX_AGE', 60))
+    
+    # NDVI raster tiles proxied from Agromonitoring; tiles for a scene never change
+    NDVI_TILE_CACHE_DIR = os.environ.get(
+        'NDVI_TILE_CACHE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ndvi_tiles')
+    )
+    NDVI_TILE_CACHE_MAX_BYTES = int(os.environ.get('NDVI_TILE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    NDVI_TILE_MAX_AGE = int(os.environ.get('NDVI_TILE_MAX_AGE', 365 * 24 * 3600))
+    
     # Agromonitoring API configuration
     AGROMONITORING_API_KEY = os.environ.get('AGROMONITORING_API_KEY')
-    AGROMONITORING_API_URL = 'https://api.agromonitoring.com/agro/1.0' 
\ No newline at end of file
+    AGROMONITORING_API_URL = 'https://api.agromonitoring.com/agro/1.0'
+    
+    # Upstream HTTP client configuration
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 30))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.5))
+    HTTP_MAX_RETRY_AFTER = float(os.environ.get('HTTP_MAX_RETRY_AFTER', 30))
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 16))
+    
+    # Agromonitoring quota, shared by every worker process on the host
+    AGROMONITORING_RATE_LIMIT = int(os.environ.get('AGROMONITORING_RATE_LIMIT', 60))  # Requests per minute, 0 disables
+    AGROMONITORING_RATE_LIMIT_BURST = int(os.environ.get('AGROMONITORING_RATE_LIMIT_BURST', 10))
+    AGROMONITORING_RATE_LIMIT_WAIT = float(os.environ.get('AGROMONITORING_RATE_LIMIT_WAIT', 10))
+    AGROMONITORING_RATE_LIMIT_PATH = os.environ.get(
+        'AGROMONITORING_RATE_LIMIT_PATH',
+        os.path.join(tempfile.gettempdir(), 'agromonitoring_ratelimit.sqlite')
+    )
+    
+    # Weather cache configuration
+    WEATHER_CACHE_TTL_SECONDS = int(os.environ.get('WEATHER_CACHE_TTL_SECONDS', 3600))
+    WEATHER_GRID_DEGREES = float(os.environ.get('WEATHER_GRID_DEGREES', 0.05))  # Roughly 5 km cells
+    WEATHER_BATCH_MAX_PADDOCKS = int(os.environ.get('WEATHER_BATCH_MAX_PADDOCKS', 200))
+    
+    # Run independent upstream calls concurrently on a shared thread pool
+    UPSTREAM_CONCURRENCY = os.environ.get('UPSTREAM_CONCURRENCY', '1') == '1'
+    UPSTREAM_MAX_WORKERS = int(os.environ.get('UPSTREAM_MAX_WORKERS', 8))
+    
+    # NDVI cache configuration
+    # How often the open end of a cached date range is re-checked upstream
+    NDVI_CACHE_REFRESH_SECONDS = int(os.environ.get('NDVI_CACHE_REFRESH_SECONDS', 6 * 3600))
+    # Scenes can be published some time after acquisition, so the most recent
+    # window is re-fetched on refresh instead of being marked as synced
+    NDVI_CACHE_SETTLE_HOURS = int(os.environ.get('NDVI_CACHE_SETTLE_HOURS', 48))
+    
+    # NDVI time-series analytics: smoothing and rolling mean windows in days, the cloud cover
+    # percentage above which scenes are ignored, and the day-of-year bins used for anomalies
+    NDVI_SMOOTHING_DAYS = float(os.environ.get('NDVI_SMOOTHING_DAYS', 15))
+    NDVI_ROLLING_DAYS = float(os.environ.get('NDVI_ROLLING_DAYS', 30))
+    NDVI_MAX_CLOUDS = float(os.environ.get('NDVI_MAX_CLOUDS', 30))
+    NDVI_ANOMALY_BIN_DAYS = int(os.environ.get('NDVI_ANOMALY_BIN_DAYS', 16))
+    
+    # Farm NDVI summary: the latest scene is compared with the mean of this many earlier
+    # scenes, and a change larger than the threshold counts as improving or declining
+    NDVI_TREND_SCENES = int(os.environ.get('NDVI_TREND_SCENES', 3))
+    NDVI_TREND_THRESHOLD = float(os.environ.get('NDVI_TREND_THRESHOLD', 0.05))
+    
+    # Time-series retention, run with `flask data retention`. Weather forecasts and NDVI scene
+    # statistics are cleared after the raw retention periods; weather readings are summarised
+    # by day after WEATHER_DOWNSAMPLE_DAYS and daily summaries by week after WEATHER_WEEKLY_DAYS
+    WEATHER_RAW_RETENTION_DAYS = int(os.environ.get('WEATHER_RAW_RETENTION_DAYS', 7))
+    WEATHER_DOWNSAMPLE_DAYS = int(os.environ.get('WEATHER_DOWNSAMPLE_DAYS', 90))
+    WEATHER_WEEKLY_DAYS = int(os.environ.get('WEATHER_WEEKLY_DAYS', 730))
+    NDVI_RAW_RETENTION_DAYS = int(os.environ.get('NDVI_RAW_RETENTION_DAYS', 365))
+    # Monthly partitions created ahead of time on PostgreSQL, see services.partitions
+    PARTITION_MONTHS_AHEAD = int(os.environ.get('PARTITION_MONTHS_AHEAD', 3))
+    
+    # Background NDVI ingestion, run with `flask ndvi ingest` or the in-process worker
+    NDVI_INGEST_WORKER = os.environ.get('NDVI_INGEST_WORKER', '0') == '1'
+    NDVI_INGEST_INTERVAL_SECONDS = int(os.environ.get('NDVI_INGEST_INTERVAL_SECONDS', 3600))
+    NDVI_INGEST_LOOKBACK_DAYS = int(os.environ.get('NDVI_INGEST_LOOKBACK_DAYS', 30))
+    NDVI_INGEST_CONCURRENCY = int(os.environ.get('NDVI_INGEST_CONCURRENCY', 4))
+    NDVI_INGEST_LOCK_PATH = os.environ.get(
+        'NDVI_INGEST_LOCK_PATH',
+        os.path.join(tempfile.gettempdir(), 'ndvi_ingest.lock')
+    ) 
\ No newline at end of file
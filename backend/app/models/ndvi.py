@@ -1,26 +1,69 @@
 import uuid
 from datetime import datetime
 from app import db
+from app.utils.helpers import strip_api_key
 
 class NDVIHistory(db.Model):
     __tablename__ = 'ndvi_history'
     
     id = db.Column(db.UUID, primary_key=True, default=uuid.uuid4)
     paddock_id = db.Column(db.UUID, db.ForeignKey('paddocks.id'), nullable=False)
-    date = db.Column(db.DateTime, nullable=False)
-    ndvi_value = db.Column(db.Float, nullable=False)
+    date = db.Column(db.DateTime, primary_key=True, nullable=False)  # Partition key, so part of the primary key
+    ndvi_value = db.Column(db.Float, nullable=True)  # Mean NDVI, null until statistics are available
     image_url = db.Column(db.String(255), nullable=True)
+    
+    # Scene metadata from the image search
+    satellite = db.Column(db.String(64), nullable=True)
+    clouds = db.Column(db.Float, nullable=True)
+    coverage = db.Column(db.Float, nullable=True)
+    sun = db.Column(db.JSON(none_as_null=True), nullable=True)
+    image_urls = db.Column(db.JSON(none_as_null=True), nullable=True)
+    
+    # Statistics from the NDVI history
+    ndvi_min = db.Column(db.Float, nullable=True)
+    ndvi_max = db.Column(db.Float, nullable=True)
+    ndvi_median = db.Column(db.Float, nullable=True)
+    ndvi_std = db.Column(db.Float, nullable=True)
+    
+    # Full statistics from the stats endpoint, fetched lazily. JSON columns store None as
+    # SQL NULL so scene upserts can keep values a later fetch did not return
+    statistics = db.Column(db.JSON(none_as_null=True), nullable=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # One row per paddock and scene date, covering the columns the summary and analytics read
+        db.Index(
+            'uq_ndvi_history_paddock_id_date', 'paddock_id', 'date',
+            unique=True, postgresql_include=['ndvi_value', 'clouds']
+        ),
+        db.Index('ix_ndvi_history_date_brin', 'date', postgresql_using='brin'),
+        # Monthly partitions on PostgreSQL, see services.partitions
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
+    
     # Relationships
     paddock = db.relationship('Paddock', back_populates='ndvi_history')
     
-    def __init__(self, paddock_id, date, ndvi_value, image_url=None):
+    def __init__(self, paddock_id, date, ndvi_value=None, image_url=None, **kwargs):
         self.id = uuid.uuid4()
         self.paddock_id = paddock_id
         self.date = date
         self.ndvi_value = ndvi_value
         self.image_url = image_url
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+    
+    def to_history_entry(self):
+        """Format the record like an Agromonitoring NDVI history entry"""
+        return {
+            'date': self.date.isoformat(),
+            'ndvi': self.ndvi_value,
+            'min': self.ndvi_min,
+            'max': self.ndvi_max,
+            'median': self.ndvi_median,
+            'std': self.ndvi_std
+        }
     
     def to_dict(self):
         return {
@@ -28,6 +71,13 @@ class NDVIHistory(db.Model):
             'paddock_id': str(self.paddock_id),
             'date': self.date.isoformat(),
             'ndvi_value': self.ndvi_value,
-            'image_url': self.image_url,
+            'image_url': strip_api_key(self.image_url),
+            'satellite': self.satellite,
+            'clouds': self.clouds,
+            'coverage': self.coverage,
+            'ndvi_min': self.ndvi_min,
+            'ndvi_max': self.ndvi_max,
+            'ndvi_median': self.ndvi_median,
+            'ndvi_std': self.ndvi_std,
             'created_at': self.created_at.isoformat()
-        } 
\ No newline at end of file
+        }
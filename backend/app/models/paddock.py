@@ -1,47 +1,95 @@
 import uuid
 import json
 from datetime import datetime
+from flask import current_app
 from app import db
-from shapely.geometry import shape
-from pyproj import Geod
+from app.models.paddock_geometry import PaddockGeometryLevel
+from app.models.types import Geometry
+from app.utils.fastjson import RawJSON
+from app.services.geometry import build_geometry_levels, calculate_area, calculate_bounds, calculate_centroids
 
 class Paddock(db.Model):
     __tablename__ = 'paddocks'
     
     id = db.Column(db.UUID, primary_key=True, default=uuid.uuid4)
     name = db.Column(db.String(255), nullable=False)
-    geometry = db.Column(db.Text, nullable=False)  # GeoJSON encoded as text
+    geometry = db.Column(Geometry('POLYGON', 4326), nullable=False)  # PostGIS geometry, read and written as GeoJSON text
     area = db.Column(db.Float, nullable=False)  # Area in hectares
     agromonitoring_id = db.Column(db.String(255), nullable=True)
+    
+    # Centroid and bounding box, kept in step with geometry so lookups never parse it
+    centroid_lat = db.Column(db.Float, nullable=True)
+    centroid_lon = db.Column(db.Float, nullable=True)
+    min_lon = db.Column(db.Float, nullable=True)
+    min_lat = db.Column(db.Float, nullable=True)
+    max_lon = db.Column(db.Float, nullable=True)
+    max_lat = db.Column(db.Float, nullable=True)
+    
+    # Date range of NDVI scenes already cached in ndvi_history
+    ndvi_synced_from = db.Column(db.DateTime, nullable=True)
+    ndvi_synced_until = db.Column(db.DateTime, nullable=True)
+    ndvi_checked_at = db.Column(db.DateTime, nullable=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_paddocks_geometry', 'geometry', postgresql_using='gist'),
+        db.Index('ix_paddocks_created_at_id', 'created_at', 'id'),
+        db.Index('ix_paddocks_centroid', 'centroid_lat', 'centroid_lon'),
+        db.Index('ix_paddocks_bbox', 'min_lon', 'max_lon', 'min_lat', 'max_lat'),
+    )
+    
     # Relationships
     ndvi_history = db.relationship('NDVIHistory', back_populates='paddock', cascade='all, delete-orphan')
+    geometry_levels = db.relationship('PaddockGeometryLevel', back_populates='paddock', cascade='all, delete-orphan')
     
     def __init__(self, name, geometry, agromonitoring_id=None):
         self.id = uuid.uuid4()
         self.name = name
         self.geometry = json.dumps(geometry) if isinstance(geometry, dict) else geometry
         self.area = self.calculate_area()
+        self.refresh_location()
         self.agromonitoring_id = agromonitoring_id
+        self.refresh_geometry_levels()
     
     def calculate_area(self):
         """Calculate the area of the paddock in hectares"""
-        geod = Geod(ellps="WGS84")
-        geojson = json.loads(self.geometry) if isinstance(self.geometry, str) else self.geometry
-        polygon = shape(geojson)
+        return calculate_area(self.geometry)
+    
+    def refresh_location(self):
+        """Store the centroid and bounding box of the current geometry"""
+        (self.centroid_lon, self.centroid_lat), = calculate_centroids([self.geometry]).tolist()
+        (self.min_lon, self.min_lat, self.max_lon, self.max_lat), = calculate_bounds([self.geometry]).tolist()
+    
+    def get_centroid(self):
+        """
+        Get the stored centroid, computing it if the row predates the location columns
         
-        # Calculate area in square meters and convert to hectares
-        area_sqm = abs(geod.geometry_area_perimeter(polygon)[0])
-        return area_sqm / 10000  # Convert square meters to hectares
+        Returns:
+            tuple: (longitude, latitude) of the centroid
+        """
+        if self.centroid_lat is None or self.centroid_lon is None:
+            self.refresh_location()
+        return self.centroid_lon, self.centroid_lat
+    
+    def refresh_geometry_levels(self):
+        """Precompute the simplified geometries served at lower zoom levels"""
+        self.geometry_levels = [
+            PaddockGeometryLevel(level, tolerance, json.dumps(simplified), vertex_count)
+            for level, tolerance, simplified, vertex_count in build_geometry_levels(
+                self.geometry, current_app.config['GEOMETRY_LOD_TOLERANCES']
+            )
+        ]
     
     def to_dict(self):
         return {
             'id': str(self.id),
             'name': self.name,
-            'geometry': json.loads(self.geometry) if isinstance(self.geometry, str) else self.geometry,
+            'geometry': RawJSON(self.geometry) if isinstance(self.geometry, str) else self.geometry,
             'area': self.area,
+            'centroid': [self.centroid_lon, self.centroid_lat] if self.centroid_lat is not None else None,
+            'bbox': [self.min_lon, self.min_lat, self.max_lon, self.max_lat] if self.min_lon is not None else None,
             'agromonitoring_id': self.agromonitoring_id,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
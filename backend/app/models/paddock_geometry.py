@@ -0,0 +1,20 @@
+from app import db
+
+class PaddockGeometryLevel(db.Model):
+    """Precomputed simplification of a paddock geometry for one level of detail"""
+    __tablename__ = 'paddock_geometry_levels'
+    
+    paddock_id = db.Column(db.UUID, db.ForeignKey('paddocks.id', ondelete='CASCADE'), primary_key=True)
+    level = db.Column(db.Integer, primary_key=True)
+    tolerance = db.Column(db.Float, nullable=False)  # Simplification tolerance in degrees
+    geometry = db.Column(db.Text, nullable=False)  # GeoJSON encoded as text
+    vertex_count = db.Column(db.Integer, nullable=False)
+    
+    # Relationships
+    paddock = db.relationship('Paddock', back_populates='geometry_levels')
+    
+    def __init__(self, level, tolerance, geometry, vertex_count):
+        self.level = level
+        self.tolerance = tolerance
+        self.geometry = geometry
+        self.vertex_count = vertex_count
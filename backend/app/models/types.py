@@ -0,0 +1,59 @@
+import json
+from sqlalchemy import func
+from sqlalchemy.types import Text, TypeDecorator, UserDefinedType
+
+class PostGISGeometry(UserDefinedType):
+    """PostGIS geometry column that is read and written as GeoJSON text"""
+    
+    cache_ok = True
+    
+    def __init__(self, geometry_type='GEOMETRY', srid=4326):
+        self.geometry_type = geometry_type
+        self.srid = srid
+    
+    def get_col_spec(self, **kw):
+        return f"geometry({self.geometry_type}, {self.srid})"
+    
+    def bind_expression(self, bindvalue):
+        return func.ST_SetSRID(func.ST_Force2D(func.ST_GeomFromGeoJSON(bindvalue)), self.srid)
+    
+    def column_expression(self, col):
+        return func.ST_AsGeoJSON(col, type_=Text)
+
+class Geometry(TypeDecorator):
+    """
+    Geometry column exposed to Python as a GeoJSON string
+    
+    Stored as a native PostGIS geometry on PostgreSQL and as GeoJSON text on
+    other databases, so the model keeps the same API shape either way.
+    """
+    
+    impl = Text
+    cache_ok = True
+    
+    def __init__(self, geometry_type='GEOMETRY', srid=4326):
+        super().__init__()
+        self.geometry_type = geometry_type
+        self.srid = srid
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(PostGISGeometry(self.geometry_type, self.srid))
+        return dialect.type_descriptor(Text())
+    
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, dict):
+            return json.dumps(value)
+        return value
+
+def is_postgis(bind):
+    """
+    Check whether spatial queries can run in the database
+    
+    Args:
+        bind: SQLAlchemy engine or connection
+        
+    Returns:
+        bool: True if geometry columns are stored as PostGIS geometries
+    """
+    return bind.dialect.name == 'postgresql'
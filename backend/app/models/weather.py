@@ -7,15 +7,30 @@ class WeatherData(db.Model):
     __tablename__ = 'weather_data'
     
     id = db.Column(db.UUID, primary_key=True, default=uuid.uuid4)
-    date = db.Column(db.DateTime, nullable=False)
+    date = db.Column(db.DateTime, primary_key=True, nullable=False)  # Observation time; partition key, so part of the primary key
+    grid_cell = db.Column(db.String(64), nullable=True)  # Spatial cache bucket, see services.weather_cache
+    lat = db.Column(db.Float, nullable=True)
+    lon = db.Column(db.Float, nullable=True)
     temperature = db.Column(db.Float, nullable=True)
     rainfall = db.Column(db.Float, nullable=True)
-    forecast = db.Column(db.JSON, nullable=True)
+    forecast = db.Column(db.JSON(none_as_null=True), nullable=True)
+    fetched_at = db.Column(db.DateTime, nullable=True)  # Last time upstream returned this observation, for the cache TTL
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def __init__(self, date, temperature=None, rainfall=None, forecast=None):
+    __table_args__ = (
+        # Unique so fetched weather can be upserted, see services.upsert
+        db.Index('uq_weather_data_grid_cell_date', 'grid_cell', 'date', unique=True),
+        db.Index('ix_weather_data_date_brin', 'date', postgresql_using='brin'),
+        # Monthly partitions on PostgreSQL, see services.partitions
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
+    
+    def __init__(self, date, temperature=None, rainfall=None, forecast=None, grid_cell=None, lat=None, lon=None):
         self.id = uuid.uuid4()
         self.date = date
+        self.grid_cell = grid_cell
+        self.lat = lat
+        self.lon = lon
         self.temperature = temperature
         self.rainfall = rainfall
         self.forecast = forecast
@@ -24,8 +39,41 @@ class WeatherData(db.Model):
         return {
             'id': str(self.id),
             'date': self.date.isoformat(),
+            'lat': self.lat,
+            'lon': self.lon,
             'temperature': self.temperature,
             'rainfall': self.rainfall,
             'forecast': self.forecast,
             'created_at': self.created_at.isoformat()
-        } 
\ No newline at end of file
+        }
+
+class WeatherSummary(db.Model):
+    """Daily or weekly aggregate of weather readings for a grid cell, kept after the raw rows are removed"""
+    __tablename__ = 'weather_summaries'
+    
+    grid_cell = db.Column(db.String(64), primary_key=True)
+    period = db.Column(db.String(8), primary_key=True)  # 'day' or 'week'
+    period_start = db.Column(db.DateTime, primary_key=True)
+    lat = db.Column(db.Float, nullable=True)
+    lon = db.Column(db.Float, nullable=True)
+    temperature_mean = db.Column(db.Float, nullable=True)
+    temperature_min = db.Column(db.Float, nullable=True)
+    temperature_max = db.Column(db.Float, nullable=True)
+    rainfall_mean = db.Column(db.Float, nullable=True)
+    rainfall_max = db.Column(db.Float, nullable=True)
+    observations = db.Column(db.Integer, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'grid_cell': self.grid_cell,
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'lat': self.lat,
+            'lon': self.lon,
+            'temperature_mean': self.temperature_mean,
+            'temperature_min': self.temperature_min,
+            'temperature_max': self.temperature_max,
+            'rainfall_mean': self.rainfall_mean,
+            'rainfall_max': self.rainfall_max,
+            'observations': self.observations
+        }
\ No newline at end of file
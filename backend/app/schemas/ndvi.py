@@ -6,6 +6,13 @@ class NDVISchema(Schema):
     date = fields.DateTime(required=True)
     ndvi_value = fields.Float(required=True)
     image_url = fields.String(allow_none=True)
+    satellite = fields.String(allow_none=True)
+    clouds = fields.Float(allow_none=True)
+    coverage = fields.Float(allow_none=True)
+    ndvi_min = fields.Float(allow_none=True)
+    ndvi_max = fields.Float(allow_none=True)
+    ndvi_median = fields.Float(allow_none=True)
+    ndvi_std = fields.Float(allow_none=True)
     created_at = fields.DateTime(dump_only=True)
     
     @validates('ndvi_value')
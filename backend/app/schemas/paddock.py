@@ -1,14 +1,19 @@
 from marshmallow import Schema, fields, validates, ValidationError
 import json
 
+from app.utils.fastjson import RawJSON
+
 class GeoJSONField(fields.Field):
-    """Field that serializes to a GeoJSON dict and deserializes to a GeoJSON dict."""
+    """Field that serializes to GeoJSON and deserializes to a GeoJSON dict.
+    
+    Stored GeoJSON text is passed through as RawJSON rather than parsed and re-encoded.
+    """
     
     def _serialize(self, value, attr, obj, **kwargs):
         if value is None:
             return None
         if isinstance(value, str):
-            return json.loads(value)
+            return RawJSON(value)
         return value
     
     def _deserialize(self, value, attr, data, **kwargs):
@@ -38,10 +43,28 @@ class PaddockSchema(Schema):
     name = fields.String(required=True)
     geometry = GeoJSONField(required=True)
     area = fields.Float(dump_only=True)
+    centroid = fields.Method('get_centroid', dump_only=True)
+    bbox = fields.Method('get_bbox', dump_only=True)
     agromonitoring_id = fields.String(dump_only=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
     
+    # Derived fields and the columns they are read from
+    COLUMNS = {
+        'centroid': ('centroid_lon', 'centroid_lat'),
+        'bbox': ('min_lon', 'min_lat', 'max_lon', 'max_lat'),
+    }
+    
+    def get_centroid(self, obj):
+        if obj.centroid_lat is None:
+            return None
+        return [obj.centroid_lon, obj.centroid_lat]
+    
+    def get_bbox(self, obj):
+        if obj.min_lon is None:
+            return None
+        return [obj.min_lon, obj.min_lat, obj.max_lon, obj.max_lat]
+    
     @validates('name')
     def validate_name(self, value):
         if len(value) < 1:
@@ -3,6 +3,8 @@ from marshmallow import Schema, fields
 class WeatherSchema(Schema):
     id = fields.UUID(dump_only=True)
     date = fields.DateTime(required=True)
+    lat = fields.Float(allow_none=True)
+    lon = fields.Float(allow_none=True)
     temperature = fields.Float(allow_none=True)
     rainfall = fields.Float(allow_none=True)
     forecast = fields.Dict(allow_none=True)
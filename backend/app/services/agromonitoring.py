@@ -1,8 +1,17 @@
-import requests
 import json
+import logging
 from datetime import datetime
 from flask import current_app
-from app.utils.helpers import format_exception
+from app.services.http import get_session, get_timeout
+from app.services.ratelimit import RateLimitExceeded, get_rate_limiter
+from app.utils.helpers import format_exception, redact_api_key
+from app.utils.log import lazy_json
+from app.utils.singleflight import SingleFlight
+
+# Identical GET requests in flight at the same time share one upstream call
+_in_flight = SingleFlight()
+
+logger = logging.getLogger(__name__)
 
 class AgromonitoringService:
     """Service to interact with the Agromonitoring API"""
@@ -10,6 +19,47 @@ class AgromonitoringService:
     def __init__(self):
         self.api_key = current_app.config['AGROMONITORING_API_KEY']
         self.base_url = current_app.config['AGROMONITORING_API_URL']
+        self.session = get_session()
+        self.timeout = get_timeout()
+        self.rate_limiter = get_rate_limiter()
+        self.rate_limit_wait = current_app.config['AGROMONITORING_RATE_LIMIT_WAIT']
+    
+    def _request(self, method, url, **kwargs):
+        """
+        Send a request through the shared pooled session
+        
+        Idempotent methods are retried with backoff on connection errors and
+        429/5xx responses. The first attempt and each retry take a rate limiter token.
+        
+        Args:
+            method (str): HTTP method
+            url (str): Full request URL
+            **kwargs: Extra arguments passed to requests
+            
+        Returns:
+            requests.Response: The final response
+        """
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+            raise RateLimitExceeded("Agromonitoring API rate limit exceeded")
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+    
+    def _get_json(self, url):
+        """
+        GET a JSON resource, sharing the call with identical requests already in flight
+        
+        Args:
+            url (str): Full request URL
+            
+        Returns:
+            The decoded JSON response
+        """
+        def fetch():
+            response = self._request('GET', url)
+            response.raise_for_status()
+            return response.json()
+        
+        return _in_flight.do(url, fetch)
     
     def create_polygon(self, name, geojson):
         """
@@ -48,11 +98,11 @@ class AgromonitoringService:
                 "geo_json": formatted_geojson
             }
             
-            response = requests.post(url, json=payload)
+            response = self._request('POST', url, json=payload)
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            error_msg = format_exception(e)
+            error_msg = redact_api_key(format_exception(e))
             current_app.logger.error(f"Error creating polygon in Agromonitoring API: {error_msg}")
             raise
     
@@ -68,7 +118,7 @@ class AgromonitoringService:
         """
         try:
             url = f"{self.base_url}/polygons/{polygon_id}?appid={self.api_key}"
-            response = requests.delete(url)
+            response = self._request('DELETE', url)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -76,7 +126,7 @@ class AgromonitoringService:
             current_app.logger.error(f"Error deleting polygon from Agromonitoring API: {error_msg}")
             return False
     
-    def get_satellite_imagery(self, polygon_id, start_date=None, end_date=None):
+    def get_satellite_imagery(self, polygon_id, start_date=None, end_date=None, raise_errors=False):
         """
         Get satellite imagery data for a polygon with all available products
         
@@ -84,6 +134,7 @@ class AgromonitoringService:
             polygon_id (str): ID of the polygon in Agromonitoring
             start_date (datetime, optional): Start date for image search
             end_date (datetime, optional): End date for image search
+            raise_errors (bool, optional): Re-raise upstream errors instead of returning an empty list
             
         Returns:
             list: List of available satellite images
@@ -102,11 +153,9 @@ class AgromonitoringService:
             end_ts = int(end_date.timestamp())
             
             url = f"{self.base_url}/image/search?appid={self.api_key}&polyid={polygon_id}&start={start_ts}&end={end_ts}"
-            response = requests.get(url)
-            response.raise_for_status()
             
             # Process and enhance the response
-            images = response.json()
+            images = self._get_json(url)
             for image in images:
                 # Add formatted date
                 if 'dt' in image:
@@ -122,56 +171,100 @@ class AgromonitoringService:
         except Exception as e:
             error_msg = format_exception(e)
             current_app.logger.error(f"Error getting satellite imagery from Agromonitoring API: {error_msg}")
+            if raise_errors:
+                raise
             return []
     
-    def get_ndvi_data(self, polygon_id, ndvi_url):
+    def get_ndvi_data(self, polygon_id, ndvi_url, raise_errors=False):
         """
         Get NDVI statistics for a polygon using a specific satellite image
         
         Args:
             polygon_id (str): ID of the polygon in Agromonitoring
             ndvi_url (str): Full NDVI URL from the image search response
+            raise_errors (bool, optional): Re-raise upstream errors instead of returning an empty dict
             
         Returns:
             dict: NDVI statistics for the polygon
         """
         try:
-            # Extract the preset code and image ID from the NDVI URL
-            parts = ndvi_url.split('/')
-            if len(parts) >= 2:
-                preset_code = parts[-2]  # e.g., "020598ba200"
-                image_id = parts[-1].split('?')[0]
-                
-                # Get statistics
-                stats_url = f"{self.base_url}/stats/1.0/{preset_code}/{image_id}?appid={self.api_key}"
-                current_app.logger.info(f"Requesting NDVI stats from URL: {stats_url}")
-                
-                stats_response = requests.get(stats_url)
-                current_app.logger.info(f"Response status code: {stats_response.status_code}")
-                current_app.logger.info(f"Response headers: {stats_response.headers}")
-                current_app.logger.info(f"Response content: {stats_response.text}")
-                
-                stats_response.raise_for_status()
-                stats = stats_response.json()
-                
-                # Get tile URL for map display
-                tile_url = f"{self.base_url}/tile/1.0/{{z}}/{{x}}/{{y}}/{preset_code}/{image_id}?appid={self.api_key}"
-                
-                # Combine statistics and URLs
-                return {
-                    'statistics': stats,
-                    'tile_url': tile_url,
-                    'image_url': ndvi_url,
-                    'preset_code': preset_code,
-                    'image_id': image_id
-                }
-            else:
-                raise ValueError("Invalid NDVI URL format")
+            preset_code, image_id = self.parse_ndvi_url(ndvi_url)
+            
+            # Get statistics
+            stats_url = f"{self.base_url}/stats/1.0/{preset_code}/{image_id}?appid={self.api_key}"
+            logger.debug("Requesting NDVI stats for preset %s, image %s", preset_code, image_id)
+            
+            stats = self._get_json(stats_url)
+            logger.debug("NDVI stats: %s", lazy_json(stats))
+            
+            # Combine statistics and URLs
+            return {
+                'statistics': stats,
+                'tile_url': self.get_ndvi_tile_url(ndvi_url),
+                'image_url': ndvi_url,
+                'preset_code': preset_code,
+                'image_id': image_id
+            }
         except Exception as e:
             error_msg = format_exception(e)
             current_app.logger.error(f"Error getting NDVI data from Agromonitoring API: {error_msg}")
+            if raise_errors:
+                raise
             return {}
     
+    def parse_ndvi_url(self, ndvi_url):
+        """
+        Extract the preset code and image ID from an NDVI image URL
+        
+        Args:
+            ndvi_url (str): Full NDVI URL from the image search response
+            
+        Returns:
+            tuple: (preset_code, image_id)
+        """
+        parts = ndvi_url.split('/')
+        if len(parts) < 2:
+            raise ValueError("Invalid NDVI URL format")
+        preset_code = parts[-2]  # e.g., "020598ba200"
+        image_id = parts[-1].split('?')[0]
+        return preset_code, image_id
+    
+    def get_ndvi_tile_url(self, ndvi_url):
+        """
+        Get the map tile URL template for an NDVI image
+        
+        Args:
+            ndvi_url (str): Full NDVI URL from the image search response
+            
+        Returns:
+            str: Tile URL template with {z}/{x}/{y} placeholders
+        """
+        preset_code, image_id = self.parse_ndvi_url(ndvi_url)
+        return f"{self.base_url}/tile/1.0/{{z}}/{{x}}/{{y}}/{preset_code}/{image_id}?appid={self.api_key}"
+    
+    def get_ndvi_tile(self, z, x, y, preset_code, image_id):
+        """
+        Download one NDVI map tile
+        
+        Args:
+            z (int): Zoom level
+            x (int): Tile column
+            y (int): Tile row
+            preset_code (str): Preset code from the NDVI image URL
+            image_id (str): ID of the satellite image
+            
+        Returns:
+            bytes: PNG tile
+        """
+        url = f"{self.base_url}/tile/1.0/{z}/{x}/{y}/{preset_code}/{image_id}?appid={self.api_key}"
+        
+        def fetch():
+            response = self._request('GET', url)
+            response.raise_for_status()
+            return response.content
+        
+        return _in_flight.do(url, fetch)
+    
     def get_ndvi_image_url(self, image_id):
         """
         Get the URL for an NDVI image
@@ -184,7 +277,7 @@ class AgromonitoringService:
         """
         return f"{self.base_url}/image/ndvi/{image_id}?appid={self.api_key}"
     
-    def get_ndvi_history(self, polygon_id, start_date=None, end_date=None):
+    def get_ndvi_history(self, polygon_id, start_date=None, end_date=None, raise_errors=False):
         """
         Get historical NDVI data for a polygon
         
@@ -192,6 +285,7 @@ class AgromonitoringService:
             polygon_id (str): ID of the polygon in Agromonitoring
             start_date (datetime, optional): Start date for historical data
             end_date (datetime, optional): End date for historical data
+            raise_errors (bool, optional): Re-raise upstream errors instead of returning an empty list
             
         Returns:
             list: List of historical NDVI data
@@ -208,15 +302,13 @@ class AgromonitoringService:
             end_ts = int(end_date.timestamp())
             
             url = f"{self.base_url}/ndvi/history?polyid={polygon_id}&start={start_ts}&end={end_ts}&appid={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            history = response.json()
+            history = self._get_json(url)
             # Format dates and ensure consistent structure
             formatted_history = []
             for entry in history:
                 if 'dt' in entry and 'data' in entry:
                     formatted_history.append({
+                        'dt': entry['dt'],
                         'date': datetime.fromtimestamp(entry['dt']).isoformat(),
                         'ndvi': entry['data'].get('mean', 0),
                         'min': entry['data'].get('min', 0),
@@ -228,6 +320,8 @@ class AgromonitoringService:
         except Exception as e:
             error_msg = format_exception(e)
             current_app.logger.error(f"Error getting NDVI history from Agromonitoring API: {error_msg}")
+            if raise_errors:
+                raise
             return []
     
     def get_weather(self, lat, lon):
@@ -243,9 +337,7 @@ class AgromonitoringService:
         """
         try:
             url = f"{self.base_url}/weather?lat={lat}&lon={lon}&appid={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(url)
         except Exception as e:
             error_msg = format_exception(e)
             current_app.logger.error(f"Error getting weather data from Agromonitoring API: {error_msg}")
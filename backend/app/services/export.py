@@ -0,0 +1,189 @@
+import csv
+import io
+from sqlalchemy import select
+
+from app import db
+from app.models.ndvi import NDVIHistory
+from app.models.paddock import Paddock
+from app.services.spatial_index import filter_paddocks_by_bbox
+from app.utils.fastjson import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = pq = None
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 1000
+
+NDVI_COLUMNS = (
+    'paddock_id', 'date', 'ndvi_value', 'ndvi_min', 'ndvi_max', 'ndvi_median', 'ndvi_std',
+    'clouds', 'coverage', 'satellite'
+)
+
+def parquet_supported():
+    return pa is not None
+
+def stream_rows(statement, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Execute a select on a server-side cursor and yield lists of rows
+    
+    Args:
+        statement: SQLAlchemy select of plain columns
+        chunk_size (int): Rows per fetch
+    
+    Yields:
+        list: Up to chunk_size rows
+    """
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+def export_paddocks_geojson(bbox=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream every paddock as a GeoJSON FeatureCollection
+    
+    Geometry is written from the stored GeoJSON text without being parsed.
+    
+    Args:
+        bbox (tuple, optional): Only export paddocks intersecting (min_lon, min_lat, max_lon, max_lat)
+        chunk_size (int): Rows per fetch
+    
+    Yields:
+        bytes: Chunks of the FeatureCollection
+    """
+    statement = select(
+        Paddock.id, Paddock.name, Paddock.area, Paddock.agromonitoring_id,
+        Paddock.created_at, Paddock.updated_at, Paddock.geometry
+    ).order_by(Paddock.created_at, Paddock.id)
+    if bbox:
+        statement = filter_paddocks_by_bbox(statement, bbox)
+    
+    yield b'{"type":"FeatureCollection","features":['
+    first = True
+    for rows in stream_rows(statement, chunk_size):
+        chunk = bytearray()
+        for row in rows:
+            if not first:
+                chunk += b','
+            first = False
+            properties = {
+                'name': row.name,
+                'area': row.area,
+                'agromonitoring_id': row.agromonitoring_id,
+                'created_at': row.created_at,
+                'updated_at': row.updated_at
+            }
+            chunk += b'{"type":"Feature","id":"' + str(row.id).encode() + b'","geometry":'
+            chunk += row.geometry.encode('utf-8') + b',"properties":' + dumps(properties) + b'}'
+        yield bytes(chunk)
+    yield b']}\n'
+
+def ndvi_history_statement(paddock_id=None, start_date=None, end_date=None):
+    statement = select(*[getattr(NDVIHistory, column) for column in NDVI_COLUMNS])
+    if paddock_id:
+        statement = statement.where(NDVIHistory.paddock_id == paddock_id)
+    if start_date:
+        statement = statement.where(NDVIHistory.date >= start_date)
+    if end_date:
+        statement = statement.where(NDVIHistory.date <= end_date)
+    return statement.order_by(NDVIHistory.paddock_id, NDVIHistory.date)
+
+def export_ndvi_csv(paddock_id=None, start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream the NDVI history as CSV, one row per scene
+    
+    Args:
+        paddock_id (UUID, optional): Only export this paddock
+        start_date (datetime, optional): Earliest scene date
+        end_date (datetime, optional): Latest scene date
+        chunk_size (int): Rows per fetch
+    
+    Yields:
+        bytes: Chunks of CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(NDVI_COLUMNS)
+    
+    for rows in stream_rows(ndvi_history_statement(paddock_id, start_date, end_date), chunk_size):
+        writer.writerows(
+            (row.paddock_id, row.date.isoformat(), *row[2:])
+            for row in rows
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until they are drained"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def export_ndvi_parquet(paddock_id=None, start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream the NDVI history as a Parquet file, one row group per fetched chunk
+    
+    Args:
+        paddock_id (UUID, optional): Only export this paddock
+        start_date (datetime, optional): Earliest scene date
+        end_date (datetime, optional): Latest scene date
+        chunk_size (int): Rows per fetch
+    
+    Yields:
+        bytes: Chunks of the Parquet file
+    
+    Raises:
+        RuntimeError: If pyarrow is not installed
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires the pyarrow package")
+    
+    schema = pa.schema([
+        ('paddock_id', pa.string()),
+        ('date', pa.timestamp('us')),
+        ('ndvi_value', pa.float64()),
+        ('ndvi_min', pa.float64()),
+        ('ndvi_max', pa.float64()),
+        ('ndvi_median', pa.float64()),
+        ('ndvi_std', pa.float64()),
+        ('clouds', pa.float64()),
+        ('coverage', pa.float64()),
+        ('satellite', pa.string())
+    ])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in stream_rows(ndvi_history_statement(paddock_id, start_date, end_date), chunk_size):
+            columns = list(zip(*rows))
+            columns[0] = [str(value) for value in columns[0]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
@@ -1,29 +1,127 @@
 import json
+import math
+from itertools import chain
+import numpy as np
+import shapely
 from shapely.geometry import shape, mapping
 from pyproj import Geod
 
-def calculate_area(geojson):
+# WGS84 ellipsoid shared by every area calculation
+GEOD = Geod(ellps="WGS84")
+
+def _polygons_from_dicts(geojsons):
+    # Build all polygons from flat coordinate and offset arrays instead of per-object parsing
+    rings = list(chain.from_iterable(geojson['coordinates'] for geojson in geojsons))
+    coords = np.array(list(chain.from_iterable(rings)), dtype=float)
+    if coords.ndim != 2 or coords.shape[1] < 2:
+        raise ValueError("Mixed coordinate dimensions")
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum([len(ring) for ring in rings], out=ring_offsets[1:])
+    polygon_offsets = np.zeros(len(geojsons) + 1, dtype=np.int64)
+    np.cumsum([len(geojson['coordinates']) for geojson in geojsons], out=polygon_offsets[1:])
+    return shapely.from_ragged_array(
+        shapely.GeometryType.POLYGON, coords[:, :2], (ring_offsets, polygon_offsets)
+    )
+
+def to_geometries(geojsons):
     """
-    Calculate the area of a GeoJSON polygon in hectares
+    Parse many GeoJSON polygons into a shapely geometry array in one call
     
     Args:
-        geojson (dict or str): GeoJSON polygon
+        geojsons (list): GeoJSON polygons as dicts or strings, or an array of shapely geometries
         
     Returns:
-        float: Area in hectares
+        numpy.ndarray: Shapely geometries
     """
-    if isinstance(geojson, str):
-        geojson = json.loads(geojson)
+    if isinstance(geojsons, np.ndarray) and geojsons.dtype == object:
+        return geojsons
+    if all(isinstance(geojson, dict) and geojson.get('type') == 'Polygon' for geojson in geojsons):
+        try:
+            return _polygons_from_dicts(geojsons)
+        except ValueError:
+            # Mixed 2D/3D coordinates, fall back to building each polygon on its own
+            geometries = np.empty(len(geojsons), dtype=object)
+            geometries[:] = [shape(geojson) for geojson in geojsons]
+            return geometries
+    texts = [geojson if isinstance(geojson, str) else json.dumps(geojson) for geojson in geojsons]
+    return shapely.from_geojson(texts)
+
+def calculate_areas(geojsons):
+    """
+    Calculate the geodesic areas of many polygons in hectares
+    
+    Polygons are parsed and flattened into one coordinate array at once, then each
+    ring's area is taken on the WGS84 ellipsoid from its slice of that array.
+    
+    Args:
+        geojsons (list): GeoJSON polygons as dicts or strings, or an array of shapely geometries
         
-    # Create a Shapely geometry from the GeoJSON
-    polygon = shape(geojson)
+    Returns:
+        numpy.ndarray: Areas in hectares
+    """
+    geometries = to_geometries(geojsons)
+    areas = np.zeros(len(geometries))
+    if not len(geometries):
+        return areas
     
-    # Use pyproj to calculate the geodesic area
-    geod = Geod(ellps="WGS84")
-    area_sqm = abs(geod.geometry_area_perimeter(polygon)[0])
+    rings, polygon_index = shapely.get_rings(geometries, return_index=True)
+    coords = shapely.get_coordinates(rings)
+    ring_ends = np.cumsum(shapely.get_num_coordinates(rings))
+    
+    # The first ring of each polygon is its exterior, the rest are holes
+    is_exterior = np.ones(len(rings), dtype=bool)
+    is_exterior[1:] = polygon_index[1:] != polygon_index[:-1]
+    
+    start = 0
+    for ring, end in enumerate(ring_ends):
+        ring_area = abs(GEOD.polygon_area_perimeter(coords[start:end, 0], coords[start:end, 1])[0])
+        areas[polygon_index[ring]] += ring_area if is_exterior[ring] else -ring_area
+        start = end
     
     # Convert square meters to hectares
-    return area_sqm / 10000
+    return areas / 10000
+
+def calculate_centroids(geojsons):
+    """
+    Get the centroids of many polygons
+    
+    Args:
+        geojsons (list): GeoJSON polygons as dicts or strings, or an array of shapely geometries
+        
+    Returns:
+        numpy.ndarray: (n, 2) array of longitude, latitude pairs
+    """
+    geometries = to_geometries(geojsons)
+    if not len(geometries):
+        return np.empty((0, 2))
+    return shapely.get_coordinates(shapely.centroid(geometries))
+
+def calculate_bounds(geojsons):
+    """
+    Get the bounding boxes of many polygons
+    
+    Args:
+        geojsons (list): GeoJSON polygons as dicts or strings, or an array of shapely geometries
+        
+    Returns:
+        numpy.ndarray: (n, 4) array of min_lon, min_lat, max_lon, max_lat
+    """
+    geometries = to_geometries(geojsons)
+    if not len(geometries):
+        return np.empty((0, 4))
+    return shapely.bounds(geometries)
+
+def calculate_area(geojson):
+    """
+    Calculate the area of a GeoJSON polygon in hectares
+    
+    Args:
+        geojson (dict or str): GeoJSON polygon
+        
+    Returns:
+        float: Area in hectares
+    """
+    return float(calculate_areas([geojson])[0])
 
 def get_centroid(geojson):
     """
@@ -35,13 +133,22 @@ def get_centroid(geojson):
     Returns:
         tuple: (longitude, latitude) of the centroid
     """
-    if isinstance(geojson, str):
-        geojson = json.loads(geojson)
-        
-    polygon = shape(geojson)
-    centroid = polygon.centroid
+    lon, lat = calculate_centroids([geojson])[0]
+    return (float(lon), float(lat))
+
+def same_geometry(first, second):
+    """
+    Check whether two GeoJSON polygons cover the same shape
     
-    return (centroid.x, centroid.y)
+    Args:
+        first (dict or str): GeoJSON polygon
+        second (dict or str): GeoJSON polygon
+        
+    Returns:
+        bool: True if the polygons are spatially equal, whatever their encoding
+    """
+    first, second = to_geometries([first, second])
+    return bool(first.equals(second))
 
 def simplify_geometry(geojson, tolerance=0.001):
     """
@@ -60,4 +167,120 @@ def simplify_geometry(geojson, tolerance=0.001):
     polygon = shape(geojson)
     simplified = polygon.simplify(tolerance, preserve_topology=True)
     
-    return mapping(simplified) 
\ No newline at end of file
+    return mapping(simplified) 
+
+def count_vertices(geojson):
+    """
+    Count the vertices in a GeoJSON polygon
+    
+    Args:
+        geojson (dict): GeoJSON polygon
+        
+    Returns:
+        int: Number of coordinate pairs across all rings
+    """
+    return sum(len(ring) for ring in geojson.get('coordinates', []))
+
+def build_geometry_levels(geojson, tolerances):
+    """
+    Precompute simplified versions of a polygon for each level of detail
+    
+    Args:
+        geojson (dict or str): GeoJSON polygon
+        tolerances (list): Simplification tolerances in degrees, finest first
+        
+    Returns:
+        list: (level, tolerance, simplified_geojson, vertex_count) tuples, starting at level 1
+    """
+    if isinstance(geojson, str):
+        geojson = json.loads(geojson)
+    
+    levels = []
+    for level, tolerance in enumerate(sorted(tolerances), start=1):
+        simplified = simplify_geometry(geojson, tolerance)
+        # mapping() returns tuples, normalise to plain GeoJSON lists
+        simplified = json.loads(json.dumps(simplified))
+        levels.append((level, tolerance, simplified, count_vertices(simplified)))
+    return levels
+
+def select_geometry_level(tolerances, zoom=None, tolerance=None, tile_size=512):
+    """
+    Pick the coarsest level of detail whose error is not visible at a zoom or tolerance
+    
+    Args:
+        tolerances (list): Simplification tolerances in degrees, finest first
+        zoom (float, optional): Map zoom level
+        tolerance (float, optional): Maximum acceptable simplification error in degrees
+        tile_size (int): Tile size in pixels, 512 for Mapbox GL
+        
+    Returns:
+        int: Level to serve, 0 for the full geometry
+    """
+    if tolerance is None:
+        if zoom is None:
+            return 0
+        # Degrees covered by one pixel at the equator
+        tolerance = 360 / (tile_size * 2 ** zoom)
+    
+    level = 0
+    for index, level_tolerance in enumerate(sorted(tolerances), start=1):
+        if level_tolerance <= tolerance:
+            level = index
+    return level
+
+def parse_bbox(value):
+    """
+    Parse a "min_lon,min_lat,max_lon,max_lat" bounding box string
+    
+    Args:
+        value (str): Comma separated bounding box
+        
+    Returns:
+        tuple: (min_lon, min_lat, max_lon, max_lat)
+        
+    Raises:
+        ValueError: If the bounding box is malformed
+    """
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError("bbox must have four comma separated values")
+    
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+    if min_lat < -90 or max_lat > 90 or min_lon < -180 or max_lon > 180:
+        raise ValueError("bbox is outside the valid coordinate range")
+    return min_lon, min_lat, max_lon, max_lat
+
+def viewport_to_bbox(lon, lat, zoom, width, height, tile_size=512):
+    """
+    Get the bounding box of a Web Mercator map viewport
+    
+    Args:
+        lon (float): Longitude of the viewport center
+        lat (float): Latitude of the viewport center
+        zoom (float): Map zoom level
+        width (int): Viewport width in pixels
+        height (int): Viewport height in pixels
+        tile_size (int): Tile size in pixels, 512 for Mapbox GL
+        
+    Returns:
+        tuple: (min_lon, min_lat, max_lon, max_lat)
+    """
+    world_size = tile_size * 2 ** zoom
+    
+    # Project the center to world pixel coordinates
+    lat = max(min(lat, 85.0511), -85.0511)
+    center_x = (lon + 180) / 360 * world_size
+    sin_lat = math.sin(math.radians(lat))
+    center_y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * world_size
+    
+    def unproject(x, y):
+        x_lon = x / world_size * 360 - 180
+        n = math.pi - 2 * math.pi * y / world_size
+        y_lat = math.degrees(math.atan(math.sinh(n)))
+        return x_lon, y_lat
+    
+    min_lon, max_lat = unproject(center_x - width / 2, max(center_y - height / 2, 0))
+    max_lon, min_lat = unproject(center_x + width / 2, min(center_y + height / 2, world_size))
+    return max(min_lon, -180), max(min_lat, -90), min(max_lon, 180), min(max_lat, 90)
@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app
+
+from app.services.ratelimit import RateLimitExceeded, get_rate_limiter
+
+# Methods that are safe to send again after a failure
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+_session = None
+_session_lock = threading.Lock()
+
+class JitteredRetry(Retry):
+    """
+    Retry policy with full-jitter exponential backoff and a cap on Retry-After
+    
+    Every retry is another upstream request, so with a rate limiter each one
+    waits for its own token after the backoff, like the first attempt does.
+    """
+    
+    def __init__(self, *args, max_retry_after=None, rate_limiter=None, rate_limit_wait=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+        self.rate_limiter = rate_limiter
+        self.rate_limit_wait = rate_limit_wait
+    
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        retry.rate_limiter = self.rate_limiter
+        retry.rate_limit_wait = self.rate_limit_wait
+        return retry
+    
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None and self.max_retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return retry_after
+    
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+            raise RateLimitExceeded("Rate limit exceeded before retrying the request")
+
+def create_session(config, rate_limiter=None, rate_limit_wait=None):
+    """
+    Create a pooled keep-alive session that retries idempotent requests
+    
+    Args:
+        config (dict): Flask application config
+        rate_limiter (SQLiteRateLimiter, optional): Limiter each retry takes a token from
+        rate_limit_wait (float, optional): Seconds a retry may wait for a token, None to wait forever
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = JitteredRetry(
+        total=config['HTTP_MAX_RETRIES'],
+        backoff_factor=config['HTTP_BACKOFF_FACTOR'],
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        max_retry_after=config['HTTP_MAX_RETRY_AFTER'],
+        rate_limiter=rate_limiter,
+        rate_limit_wait=rate_limit_wait
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config['HTTP_POOL_CONNECTIONS'],
+        pool_maxsize=config['HTTP_POOL_MAXSIZE'],
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session():
+    """
+    Get the process-wide HTTP session shared by all threads
+    
+    The underlying urllib3 connection pool is thread-safe, and the session
+    carries no cookies or per-request state.
+    
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(
+                    current_app.config,
+                    get_rate_limiter(),
+                    current_app.config['AGROMONITORING_RATE_LIMIT_WAIT']
+                )
+    return _session
+
+def get_timeout():
+    """
+    Get the (connect, read) timeout tuple for upstream requests
+    
+    Returns:
+        tuple: Connect and read timeouts in seconds
+    """
+    return (current_app.config['HTTP_CONNECT_TIMEOUT'], current_app.config['HTTP_READ_TIMEOUT'])
+
+def _reset_session():
+    global _session
+    _session = None
+
+# Connections must not be shared with a forked worker process
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_session)
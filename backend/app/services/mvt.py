@@ -0,0 +1,220 @@
+import math
+import struct
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon, Polygon
+
+# Mapbox Vector Tile geometry commands
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+POLYGON = 3
+
+def tile_bounds(z, x, y):
+    """
+    Get the longitude/latitude bounds of a Web Mercator tile
+    
+    Args:
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+    
+    Returns:
+        tuple: (min_lon, min_lat, max_lon, max_lat)
+    """
+    n = 2 ** z
+    
+    def tile_lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    
+    return x / n * 360 - 180, tile_lat(y + 1), (x + 1) / n * 360 - 180, tile_lat(y)
+
+def tile_range(bounds, z):
+    """
+    Get the tiles at a zoom level that cover a longitude/latitude box
+    
+    Args:
+        bounds (tuple): (min_lon, min_lat, max_lon, max_lat)
+        z (int): Zoom level
+    
+    Returns:
+        tuple: (min_x, min_y, max_x, max_y) inclusive tile indices
+    """
+    n = 2 ** z
+    
+    def to_tile(lon, lat):
+        lat = max(min(lat, 85.0511), -85.0511)
+        tx = (lon + 180) / 360 * n
+        ty = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+        return min(max(int(tx), 0), n - 1), min(max(int(ty), 0), n - 1)
+    
+    min_x, min_y = to_tile(bounds[0], bounds[3])
+    max_x, max_y = to_tile(bounds[2], bounds[1])
+    return min_x, min_y, max_x, max_y
+
+def project_to_tile(geometry, z, x, y, extent=4096):
+    """
+    Project a longitude/latitude geometry into tile pixel coordinates
+    
+    Args:
+        geometry: Shapely geometry in EPSG:4326
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+        extent (int): Tile extent in pixels
+    
+    Returns:
+        Shapely geometry in tile coordinates, y axis pointing down
+    """
+    n = 2 ** z
+    
+    def transform(coords):
+        lon = coords[:, 0]
+        lat = np.clip(coords[:, 1], -85.0511, 85.0511)
+        px = ((lon + 180) / 360 * n - x) * extent
+        py = ((1 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2 * n - y) * extent
+        return np.column_stack([px, py])
+    
+    return shapely.transform(geometry, transform)
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+def _field(number, wire_type, payload):
+    key = _varint((number << 3) | wire_type)
+    if wire_type == 2:
+        return key + _varint(len(payload)) + payload
+    return key + payload
+
+def _packed(numbers):
+    return b''.join(_varint(number) for number in numbers)
+
+def _encode_value(value):
+    if isinstance(value, bool):
+        return _field(7, 0, _varint(int(value)))
+    if isinstance(value, int):
+        return _field(6, 0, _varint(_zigzag(value)))
+    if isinstance(value, float):
+        return _field(3, 1, struct.pack('<d', value))
+    return _field(1, 2, str(value).encode('utf-8'))
+
+def _ring_commands(ring, exterior, cursor):
+    points = [(int(round(px)), int(round(py))) for px, py in ring.coords[:-1]]
+    
+    # Drop repeated points created by rounding to the tile grid
+    deduped = [point for index, point in enumerate(points) if index == 0 or point != points[index - 1]]
+    if len(deduped) > 1 and deduped[0] == deduped[-1]:
+        deduped.pop()
+    if len(deduped) < 3:
+        return []
+    
+    # Exterior rings need a positive surveyor's area in tile coordinates, interior rings negative
+    area = sum(
+        x1 * y2 - x2 * y1
+        for (x1, y1), (x2, y2) in zip(deduped, deduped[1:] + deduped[:1])
+    )
+    if area == 0:
+        return []
+    if (area > 0) != exterior:
+        deduped.reverse()
+    
+    commands = []
+    for index, (px, py) in enumerate(deduped):
+        if index == 0:
+            commands.append(MOVE_TO | (1 << 3))
+        elif index == 1:
+            commands.append(LINE_TO | ((len(deduped) - 1) << 3))
+        commands.append(_zigzag(px - cursor[0]))
+        commands.append(_zigzag(py - cursor[1]))
+        cursor[0], cursor[1] = px, py
+    commands.append(CLOSE_PATH | (1 << 3))
+    return commands
+
+def _polygon_commands(geometry):
+    if isinstance(geometry, Polygon):
+        polygons = [geometry]
+    elif isinstance(geometry, MultiPolygon):
+        polygons = list(geometry.geoms)
+    else:
+        polygons = [geom for geom in getattr(geometry, 'geoms', []) if isinstance(geom, Polygon)]
+    
+    cursor = [0, 0]
+    commands = []
+    for polygon in polygons:
+        exterior = _ring_commands(polygon.exterior, True, cursor)
+        if not exterior:
+            continue
+        commands.extend(exterior)
+        for interior in polygon.interiors:
+            commands.extend(_ring_commands(interior, False, cursor))
+    return commands
+
+def encode_tile(layer_name, features, z, x, y, extent=4096, buffer=64):
+    """
+    Encode polygon features as a Mapbox Vector Tile with a single layer
+    
+    Args:
+        layer_name (str): Name of the layer
+        features (list): (shapely_geometry, properties) tuples in EPSG:4326
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+        extent (int): Tile extent in pixels
+        buffer (int): Pixels of geometry kept outside the tile edge
+    
+    Returns:
+        bytes: Protobuf encoded tile, empty if no feature falls in the tile
+    """
+    keys, key_index = [], {}
+    values, value_index = [], {}
+    encoded_features = []
+    
+    for geometry, properties in features:
+        projected = project_to_tile(geometry, z, x, y, extent)
+        clipped = shapely.clip_by_rect(projected, -buffer, -buffer, extent + buffer, extent + buffer)
+        commands = _polygon_commands(clipped)
+        if not commands:
+            continue
+        
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+            value_key = (type(value), value)
+            if value_key not in value_index:
+                value_index[value_key] = len(values)
+                values.append(value)
+            tags.extend([key_index[key], value_index[value_key]])
+        
+        encoded_features.append(
+            _field(2, 2, _packed(tags))
+            + _field(3, 0, _varint(POLYGON))
+            + _field(4, 2, _packed(commands))
+        )
+    
+    if not encoded_features:
+        return b''
+    
+    layer = (
+        _field(15, 0, _varint(2))
+        + _field(1, 2, layer_name.encode('utf-8'))
+        + b''.join(_field(2, 2, feature) for feature in encoded_features)
+        + b''.join(_field(3, 2, key.encode('utf-8')) for key in keys)
+        + b''.join(_field(4, 2, _encode_value(value)) for value in values)
+        + _field(5, 0, _varint(extent))
+    )
+    return _field(3, 2, layer)
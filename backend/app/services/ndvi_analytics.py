@@ -0,0 +1,366 @@
+import uuid
+from datetime import datetime, timedelta
+from itertools import chain, islice
+import numpy as np
+from flask import current_app
+from sqlalchemy import String, select, type_coerce
+
+from app import db
+from app.models.ndvi import NDVIHistory
+from app.utils.helpers import NDVI_HEALTH_THRESHOLDS
+
+HEALTH_LABELS = np.array(['Low', 'Medium', 'High', 'Unknown'])
+
+DAYS_PER_YEAR = 365.25
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+# Spacing between paddocks on the combined (paddock, day) sort key, larger than any
+# day offset so time windows never reach into the neighbouring paddock
+_GROUP_STRIDE = 1e6
+
+# Longest smoothing or rolling window accepted, well inside _GROUP_STRIDE
+MAX_WINDOW_DAYS = 3650
+
+class NDVISeries:
+    """
+    NDVI observations for one or more paddocks held in contiguous arrays
+    
+    Observations are sorted by paddock and then by date, so each paddock is a
+    contiguous slice and every calculation runs over all paddocks at once.
+    """
+    
+    def __init__(self, paddock_ids, groups, dates, values, clouds):
+        self.paddock_ids = paddock_ids
+        self.groups = groups
+        self.dates = dates
+        self.values = values
+        self.clouds = clouds
+        self.days = (dates - np.datetime64(0, 's')).astype(np.float64) / 86400
+        self.key = groups * _GROUP_STRIDE + self.days
+        
+        # First and last observation of each paddock
+        self.starts = np.flatnonzero(np.diff(groups, prepend=-1))
+        self.ends = np.r_[self.starts[1:], len(groups)][:len(self.starts)] - 1
+    
+    def __len__(self):
+        return len(self.values)
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a series from (paddock_id, date, ndvi_value, clouds) rows sorted by paddock and date
+        
+        Args:
+            rows (list): Query rows
+        
+        Returns:
+            NDVISeries: The series
+        """
+        if not rows:
+            empty = np.empty(0)
+            return cls([], np.empty(0, dtype=np.intp), np.empty(0, dtype='datetime64[s]'), empty, empty)
+        
+        ids, dates, values, clouds = zip(*rows)
+        count = len(ids)
+        boundaries = np.fromiter(
+            chain((True,), (a != b for a, b in zip(ids, islice(ids, 1, None)))), dtype=bool, count=count
+        )
+        # Converting datetimes through integer seconds is far faster than numpy's datetime parsing
+        seconds = np.fromiter(((date - _EPOCH) // _SECOND for date in dates), dtype=np.int64, count=count)
+        return cls(
+            [uuid.UUID(str(ids[index])) for index in np.flatnonzero(boundaries)],
+            np.cumsum(boundaries) - 1,
+            seconds.astype('datetime64[s]'),
+            np.array(values, dtype=np.float64),
+            np.array(clouds, dtype=np.float64)
+        )
+
+def load_series(paddock_ids=None, start_date=None, end_date=None):
+    """
+    Load NDVI observations from NDVIHistory with a single query
+    
+    Args:
+        paddock_ids (list, optional): Paddocks to load, defaults to every paddock
+        start_date (datetime, optional): Earliest scene date
+        end_date (datetime, optional): Latest scene date
+    
+    Returns:
+        NDVISeries: Observations that have an NDVI value
+    """
+    # Paddock IDs are read as plain strings, skipping a UUID conversion per row
+    statement = select(
+        type_coerce(NDVIHistory.paddock_id, String), NDVIHistory.date, NDVIHistory.ndvi_value, NDVIHistory.clouds
+    ).where(NDVIHistory.ndvi_value.isnot(None))
+    if paddock_ids is not None:
+        statement = statement.where(NDVIHistory.paddock_id.in_(paddock_ids))
+    if start_date:
+        statement = statement.where(NDVIHistory.date >= start_date)
+    if end_date:
+        statement = statement.where(NDVIHistory.date <= end_date)
+    statement = statement.order_by(NDVIHistory.paddock_id, NDVIHistory.date)
+    return NDVISeries.from_rows(db.session.execute(statement).all())
+
+def cloud_weights(series, max_clouds):
+    """
+    Weight observations by how clear the scene was
+    
+    Args:
+        series (NDVISeries): Observations
+        max_clouds (float): Cloud cover percentage above which a scene is ignored
+    
+    Returns:
+        numpy.ndarray: Weights between 0 and 1, 1 when cloud cover is unknown
+    """
+    clouds = np.nan_to_num(series.clouds, nan=0.0)
+    weights = np.clip(1 - clouds / 100, 0, 1)
+    weights[clouds > max_clouds] = 0
+    return weights
+
+def _window_sums(series, values, weights, before_days, after_days):
+    # Sums over [day - before_days, day + after_days] within each paddock, from prefix sums
+    valid = ~np.isnan(values) & (weights > 0)
+    weighted = np.where(valid, values * weights, 0)
+    value_sums = np.r_[0, np.cumsum(weighted)]
+    weight_sums = np.r_[0, np.cumsum(np.where(valid, weights, 0))]
+    
+    lo = np.searchsorted(series.key, series.key - before_days, side='left')
+    hi = np.searchsorted(series.key, series.key + after_days, side='right')
+    return value_sums[hi] - value_sums[lo], weight_sums[hi] - weight_sums[lo]
+
+def smooth(series, window_days, max_clouds):
+    """
+    Smooth NDVI with a centered, cloud-weighted moving average
+    
+    Args:
+        series (NDVISeries): Observations
+        window_days (float): Width of the window in days
+        max_clouds (float): Cloud cover percentage above which a scene is ignored
+    
+    Returns:
+        numpy.ndarray: Smoothed NDVI, NaN where the window holds no clear scene
+    """
+    value_sums, weight_sums = _window_sums(
+        series, series.values, cloud_weights(series, max_clouds), window_days / 2, window_days / 2
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weight_sums > 0, value_sums / weight_sums, np.nan)
+
+def rolling_mean(series, values, window_days):
+    """
+    Trailing mean of a series over the preceding window, ignoring NaN values
+    
+    Args:
+        series (NDVISeries): Observations
+        values (numpy.ndarray): Values aligned with the observations
+        window_days (float): Length of the window in days
+    
+    Returns:
+        numpy.ndarray: Rolling mean
+    """
+    value_sums, counts = _window_sums(series, values, np.ones(len(series)), window_days, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, value_sums / counts, np.nan)
+
+def growth_rate(series, values):
+    """
+    Change in NDVI per day since the previous observation of the same paddock
+    
+    Args:
+        series (NDVISeries): Observations
+        values (numpy.ndarray): Values aligned with the observations
+    
+    Returns:
+        numpy.ndarray: Growth rate, NaN for each paddock's first observation
+    """
+    rates = np.full(len(series), np.nan)
+    if len(series) < 2:
+        return rates
+    
+    elapsed = np.diff(series.days)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates[1:] = np.where(elapsed > 0, np.diff(values) / elapsed, np.nan)
+    rates[series.starts] = np.nan
+    return rates
+
+def seasonal_anomaly(series, values, bin_days):
+    """
+    Compare each observation with the same time of year in the paddock's earlier years
+    
+    Observations are grouped into day-of-year bins. The baseline is the mean of the
+    bin's yearly means over all earlier years.
+    
+    Args:
+        series (NDVISeries): Observations
+        values (numpy.ndarray): Values aligned with the observations
+        bin_days (int): Width of the day-of-year bins
+    
+    Returns:
+        tuple: (anomaly, zscore) arrays, NaN where there are too few earlier years
+    """
+    anomaly = np.full(len(series), np.nan)
+    zscore = np.full(len(series), np.nan)
+    if not len(series):
+        return anomaly, zscore
+    
+    year_starts = series.dates.astype('datetime64[Y]')
+    years = year_starts.astype(np.int64)
+    years -= years.min()
+    day_of_year = (series.dates.astype('datetime64[D]') - year_starts).astype(np.int64)
+    n_bins = -(-366 // bin_days)
+    bins = np.minimum(day_of_year // bin_days, n_bins - 1)
+    
+    shape = (len(series.paddock_ids), int(years.max()) + 1, n_bins)
+    cells = np.ravel_multi_index((series.groups, years, bins), shape)
+    valid = ~np.isnan(values)
+    counts = np.bincount(cells[valid], minlength=np.prod(shape)).reshape(shape)
+    sums = np.bincount(cells[valid], weights=values[valid], minlength=np.prod(shape)).reshape(shape)
+    
+    # Mean of each (paddock, year, bin), then running stats over the years before it
+    has_year = counts > 0
+    yearly = np.where(has_year, sums / np.maximum(counts, 1), 0)
+    prior_count = np.cumsum(has_year, axis=1) - has_year
+    prior_sum = np.cumsum(yearly, axis=1) - yearly
+    prior_squares = np.cumsum(yearly ** 2, axis=1) - yearly ** 2
+    
+    count = prior_count.ravel()[cells]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = prior_sum.ravel()[cells] / count
+        std = np.sqrt(np.maximum(prior_squares.ravel()[cells] / count - mean ** 2, 0))
+        anomaly = np.where(count > 0, values - mean, np.nan)
+        zscore = np.where((count > 1) & (std > 0), anomaly / std, np.nan)
+    return anomaly, zscore
+
+def classify_health(values):
+    """
+    Classify NDVI values as Low, Medium or High health
+    
+    Args:
+        values (numpy.ndarray): NDVI values
+    
+    Returns:
+        numpy.ndarray: Health labels, Unknown for NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    labels = np.digitize(values, NDVI_HEALTH_THRESHOLDS)
+    labels[np.isnan(values)] = len(HEALTH_LABELS) - 1
+    return HEALTH_LABELS[labels]
+
+def get_analytics_settings(smoothing_days=None, rolling_days=None, max_clouds=None):
+    config = current_app.config
+    return {
+        'smoothing_days': smoothing_days or config['NDVI_SMOOTHING_DAYS'],
+        'rolling_days': rolling_days or config['NDVI_ROLLING_DAYS'],
+        'max_clouds': config['NDVI_MAX_CLOUDS'] if max_clouds is None else max_clouds,
+        'bin_days': config['NDVI_ANOMALY_BIN_DAYS']
+    }
+
+def analyze(series, smoothing_days=None, rolling_days=None, max_clouds=None):
+    """
+    Compute smoothed NDVI, rolling means, growth rates, anomalies and health for a series
+    
+    Args:
+        series (NDVISeries): Observations
+        smoothing_days (float, optional): Smoothing window, defaults to NDVI_SMOOTHING_DAYS
+        rolling_days (float, optional): Rolling mean window, defaults to NDVI_ROLLING_DAYS
+        max_clouds (float, optional): Cloud cover cut-off, defaults to NDVI_MAX_CLOUDS
+    
+    Returns:
+        dict: Arrays aligned with the observations
+    """
+    settings = get_analytics_settings(smoothing_days, rolling_days, max_clouds)
+    smoothed = smooth(series, settings['smoothing_days'], settings['max_clouds'])
+    anomaly, zscore = seasonal_anomaly(series, smoothed, settings['bin_days'])
+    return {
+        'smoothed': smoothed,
+        'rolling_mean': rolling_mean(series, smoothed, settings['rolling_days']),
+        'growth_rate': growth_rate(series, smoothed),
+        'anomaly': anomaly,
+        'zscore': zscore,
+        'health': classify_health(smoothed)
+    }
+
+def trend_slopes(series, values):
+    """
+    Fit a straight line to each paddock's values
+    
+    Args:
+        series (NDVISeries): Observations
+        values (numpy.ndarray): Values aligned with the observations
+    
+    Returns:
+        numpy.ndarray: NDVI change per year for each paddock, NaN with fewer than two values
+    """
+    n_groups = len(series.paddock_ids)
+    valid = ~np.isnan(values)
+    groups = series.groups[valid]
+    # Years since each paddock's first observation, keeping the sums well conditioned
+    x = (series.days - series.days[series.starts][series.groups])[valid] / DAYS_PER_YEAR
+    y = values[valid]
+    
+    n = np.bincount(groups, minlength=n_groups)
+    sx = np.bincount(groups, weights=x, minlength=n_groups)
+    sy = np.bincount(groups, weights=y, minlength=n_groups)
+    sxx = np.bincount(groups, weights=x * x, minlength=n_groups)
+    sxy = np.bincount(groups, weights=x * y, minlength=n_groups)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((n > 1) & (denominator > 0), (n * sxy - sx * sy) / denominator, np.nan)
+
+def to_json_list(values):
+    """Convert an array to a list for JSON, with None in place of NaN"""
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    return np.where(np.isnan(values), None, values).tolist()
+
+def series_to_dict(series, analysis):
+    """
+    Format a series and its analysis as parallel lists
+    
+    Args:
+        series (NDVISeries): Observations
+        analysis (dict): Result of analyze
+    
+    Returns:
+        dict: Lists keyed by column name
+    """
+    return {
+        'date': np.datetime_as_string(series.dates, unit='s').tolist(),
+        'ndvi': to_json_list(series.values),
+        'clouds': to_json_list(series.clouds),
+        **{name: to_json_list(values) for name, values in analysis.items()}
+    }
+
+def trend_report(series, analysis):
+    """
+    Summarise each paddock's latest state and long-term trend
+    
+    Args:
+        series (NDVISeries): Observations of one or more paddocks
+        analysis (dict): Result of analyze
+    
+    Returns:
+        list: One summary dict per paddock
+    """
+    if not len(series):
+        return []
+    
+    latest = series.ends
+    slopes = trend_slopes(series, analysis['smoothed'])
+    columns = {
+        'paddock_id': [str(paddock_id) for paddock_id in series.paddock_ids],
+        'observations': (series.ends - series.starts + 1).tolist(),
+        'first_date': np.datetime_as_string(series.dates[series.starts], unit='s').tolist(),
+        'latest_date': np.datetime_as_string(series.dates[latest], unit='s').tolist(),
+        'latest_ndvi': to_json_list(series.values[latest]),
+        'smoothed_ndvi': to_json_list(analysis['smoothed'][latest]),
+        'rolling_mean': to_json_list(analysis['rolling_mean'][latest]),
+        'growth_rate': to_json_list(analysis['growth_rate'][latest]),
+        'anomaly': to_json_list(analysis['anomaly'][latest]),
+        'zscore': to_json_list(analysis['zscore'][latest]),
+        'health': analysis['health'][latest].tolist(),
+        'trend_per_year': to_json_list(slopes)
+    }
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
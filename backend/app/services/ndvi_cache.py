@@ -0,0 +1,291 @@
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from flask import current_app
+
+from app import db
+from app.models.ndvi import NDVIHistory
+from app.services.agromonitoring import AgromonitoringService
+from app.services.upsert import upsert
+from app.utils.concurrency import run_concurrently
+from app.utils.helpers import format_exception, to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Scene columns filled from the image search, NDVI history and statistics
+SCENE_COLUMNS = (
+    'image_url', 'image_urls', 'satellite', 'clouds', 'coverage', 'sun',
+    'ndvi_value', 'ndvi_min', 'ndvi_max', 'ndvi_median', 'ndvi_std', 'statistics'
+)
+
+class NDVICache:
+    """Read-through cache of Agromonitoring scenes and statistics stored in NDVIHistory"""
+    
+    def __init__(self, agro_service=None):
+        self.agro_service = agro_service or AgromonitoringService()
+        self.refresh_interval = timedelta(seconds=current_app.config['NDVI_CACHE_REFRESH_SECONDS'])
+        self.settle_period = timedelta(hours=current_app.config['NDVI_CACHE_SETTLE_HOURS'])
+    
+    def resolve_range(self, start_date=None, end_date=None):
+        """
+        Apply the default 30 day window used by the Agromonitoring service
+        
+        Args:
+            start_date (datetime, optional): Start of the requested range
+            end_date (datetime, optional): End of the requested range
+        
+        Returns:
+            tuple: (start_date, end_date) as naive UTC datetimes
+        """
+        end_date = to_naive_utc(end_date) or datetime.utcnow()
+        start_date = to_naive_utc(start_date) or end_date - timedelta(days=30)
+        return start_date, end_date
+    
+    def missing_ranges(self, paddock, start_date, end_date, now=None):
+        """
+        Work out which parts of a date range still have to be fetched upstream
+        
+        The cached range is kept contiguous, so gaps are always extended to
+        the edge of the range that is already synced.
+        
+        Args:
+            paddock (Paddock): The paddock being viewed
+            start_date (datetime): Start of the requested range
+            end_date (datetime): End of the requested range
+            now (datetime, optional): Current time, defaults to utcnow
+        
+        Returns:
+            list: List of (start, end) tuples to fetch
+        """
+        now = now or datetime.utcnow()
+        end_date = min(end_date, now)
+        
+        if paddock.ndvi_synced_from is None or paddock.ndvi_synced_until is None:
+            return [(start_date, end_date)] if start_date < end_date else []
+        
+        ranges = []
+        if start_date < paddock.ndvi_synced_from:
+            ranges.append((start_date, paddock.ndvi_synced_from))
+        
+        # The open end is only re-checked once per refresh interval
+        recently_checked = (
+            paddock.ndvi_checked_at is not None
+            and now - paddock.ndvi_checked_at < self.refresh_interval
+        )
+        if end_date > paddock.ndvi_synced_until and not recently_checked:
+            ranges.append((paddock.ndvi_synced_until, end_date))
+        
+        return ranges
+    
+    def sync(self, paddock, start_date, end_date):
+        """
+        Fetch any scenes missing from the cache for a date range
+        
+        Args:
+            paddock (Paddock): The paddock to sync
+            start_date (datetime): Start of the requested range
+            end_date (datetime): End of the requested range
+        
+        Returns:
+            dict: Number of upstream ranges fetched and of scenes inserted, updated and unchanged
+        """
+        counts = {'ranges': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not paddock.agromonitoring_id:
+            return counts
+        
+        now = datetime.utcnow()
+        ranges = self.missing_ranges(paddock, start_date, end_date, now)
+        if not ranges:
+            return counts
+        
+        # Scenes in the open-ended range that already have full statistics
+        latest_end = min(end_date, now)
+        known_statistics = {
+            date for date, in db.session.query(NDVIHistory.date).filter(
+                NDVIHistory.paddock_id == paddock.id,
+                NDVIHistory.date >= ranges[-1][0],
+                NDVIHistory.statistics.isnot(None)
+            )
+        }
+        
+        # Image search (plus stats for the newest scene) and history run side by side
+        calls = []
+        for range_start, range_end in ranges:
+            logger.info("Fetching NDVI scenes for paddock %s from %s to %s", paddock.id, range_start, range_end)
+            calls.append(partial(
+                self.fetch_images, paddock.agromonitoring_id, range_start, range_end,
+                known_statistics if range_end >= latest_end else None
+            ))
+            calls.append(partial(
+                self.agro_service.get_ndvi_history,
+                paddock.agromonitoring_id, range_start, range_end, raise_errors=True
+            ))
+        results = run_concurrently(*calls)
+        
+        for index, (range_start, range_end) in enumerate(ranges):
+            (images, statistics), history = results[2 * index], results[2 * index + 1]
+            for outcome, count in self.store_scenes(paddock, images, history, statistics).items():
+                counts[outcome] += count
+            
+            # Recent scenes may still be published late, so leave them unsynced
+            synced_until = min(range_end, now - self.settle_period)
+            if paddock.ndvi_synced_from is None or range_start < paddock.ndvi_synced_from:
+                paddock.ndvi_synced_from = range_start
+            if paddock.ndvi_synced_until is None or synced_until > paddock.ndvi_synced_until:
+                paddock.ndvi_synced_until = max(synced_until, range_start)
+            if range_end >= latest_end:
+                paddock.ndvi_checked_at = now
+        
+        db.session.commit()
+        counts['ranges'] = len(ranges)
+        return counts
+    
+    def fetch_images(self, polygon_id, start_date, end_date, known_statistics=None):
+        """
+        Search for images and fetch statistics for the newest one in the same call chain
+        
+        Args:
+            polygon_id (str): ID of the polygon in Agromonitoring
+            start_date (datetime): Start of the range
+            end_date (datetime): End of the range
+            known_statistics (set, optional): Scene dates that already have statistics,
+                or None to skip fetching statistics
+        
+        Returns:
+            tuple: (images, statistics) where statistics maps scene dt to stats
+        """
+        images = self.agro_service.get_satellite_imagery(
+            polygon_id, start_date, end_date, raise_errors=True
+        )
+        statistics = {}
+        if known_statistics is None:
+            return images, statistics
+        
+        ndvi_images = [image for image in images if 'dt' in image and image.get('image', {}).get('ndvi')]
+        if ndvi_images:
+            latest = max(ndvi_images, key=lambda image: image['dt'])
+            if datetime.utcfromtimestamp(latest['dt']) not in known_statistics:
+                ndvi_data = self.agro_service.get_ndvi_data(polygon_id, latest['image']['ndvi'])
+                if ndvi_data.get('statistics'):
+                    statistics[latest['dt']] = ndvi_data['statistics']
+        return images, statistics
+    
+    def store_scenes(self, paddock, images, history, statistics=None):
+        """
+        Merge image search results and NDVI history into NDVIHistory rows with one upsert
+        
+        Values missing from this fetch keep what is already stored, so fetching
+        a range again only rewrites scenes that changed upstream.
+        
+        Args:
+            paddock (Paddock): The paddock the scenes belong to
+            images (list): Images from the Agromonitoring image search
+            history (list): Entries from the Agromonitoring NDVI history
+            statistics (dict, optional): Full statistics keyed by scene dt
+        
+        Returns:
+            dict: Number of scenes inserted, updated and unchanged
+        """
+        rows = {}
+        
+        def get_row(dt):
+            date = datetime.utcfromtimestamp(dt)
+            if date not in rows:
+                rows[date] = dict.fromkeys(SCENE_COLUMNS, None)
+                rows[date].update(paddock_id=paddock.id, date=date)
+            return rows[date]
+        
+        for image in images:
+            if 'dt' not in image:
+                continue
+            row = get_row(image['dt'])
+            urls = image.get('image', {})
+            row['image_url'] = urls.get('ndvi')
+            row['image_urls'] = urls
+            row['satellite'] = image.get('type')
+            row['clouds'] = image.get('cl')
+            row['coverage'] = image.get('dc')
+            row['sun'] = image.get('sun', {})
+        
+        for entry in history:
+            if 'dt' not in entry:
+                continue
+            row = get_row(entry['dt'])
+            row['ndvi_value'] = entry.get('ndvi')
+            row['ndvi_min'] = entry.get('min')
+            row['ndvi_max'] = entry.get('max')
+            row['ndvi_median'] = entry.get('median')
+            row['ndvi_std'] = entry.get('std')
+        
+        for dt, stats in (statistics or {}).items():
+            row = get_row(dt)
+            row['statistics'] = stats
+            if row['ndvi_value'] is None:
+                row['ndvi_value'] = stats.get('mean')
+        
+        return upsert(NDVIHistory, list(rows.values()), ['paddock_id', 'date'], keep_existing=True)
+    
+    def get_scenes(self, paddock, start_date=None, end_date=None):
+        """
+        Get cached scenes for a paddock, fetching missing dates first
+        
+        Args:
+            paddock (Paddock): The paddock being viewed
+            start_date (datetime, optional): Start of the requested range
+            end_date (datetime, optional): End of the requested range
+        
+        Returns:
+            list: NDVIHistory records, newest first
+        """
+        start_date, end_date = self.resolve_range(start_date, end_date)
+        
+        try:
+            self.sync(paddock, start_date, end_date)
+        except Exception as e:
+            # Serve whatever is cached if the upstream API is unavailable
+            db.session.rollback()
+            error_msg = format_exception(e)
+            current_app.logger.error(f"Error syncing NDVI cache for paddock {paddock.id}: {error_msg}")
+        
+        return NDVIHistory.query.filter(
+            NDVIHistory.paddock_id == paddock.id,
+            NDVIHistory.date >= start_date,
+            NDVIHistory.date <= end_date
+        ).order_by(NDVIHistory.date.desc()).all()
+    
+    def get_statistics(self, paddock, record):
+        """
+        Get the full NDVI statistics for a scene, fetching them once if needed
+        
+        Args:
+            paddock (Paddock): The paddock the scene belongs to
+            record (NDVIHistory): The cached scene
+        
+        Returns:
+            dict: NDVI statistics, empty if they could not be retrieved
+        """
+        if record.statistics is not None:
+            return record.statistics
+        
+        ndvi_data = self.agro_service.get_ndvi_data(paddock.agromonitoring_id, record.image_url)
+        statistics = ndvi_data.get('statistics')
+        if not statistics:
+            return {}
+        
+        record.statistics = statistics
+        if record.ndvi_value is None:
+            record.ndvi_value = statistics.get('mean')
+        db.session.commit()
+        return statistics
+    
+    def invalidate(self, paddock):
+        """
+        Drop all cached scenes for a paddock, e.g. after its polygon changes
+        
+        Args:
+            paddock (Paddock): The paddock to invalidate
+        """
+        NDVIHistory.query.filter(NDVIHistory.paddock_id == paddock.id).delete(synchronize_session=False)
+        paddock.ndvi_synced_from = None
+        paddock.ndvi_synced_until = None
+        paddock.ndvi_checked_at = None
@@ -0,0 +1,171 @@
+import fcntl
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import current_app
+
+from app import db
+from app.models.paddock import Paddock
+from app.services.ndvi_cache import NDVICache
+from app.utils.helpers import format_exception
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def ingest_lock(path):
+    """
+    Hold an exclusive, non-blocking lock on a file for the length of an ingestion pass
+    
+    Keeps the CLI command and in-process workers in other processes from walking
+    the paddocks at the same time.
+    
+    Args:
+        path (str): Lock file path
+    
+    Yields:
+        bool: True if the lock was acquired, False if another pass holds it
+    """
+    with open(path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class NDVIIngestor:
+    """
+    Pre-fetches NDVI scenes for every registered paddock into NDVIHistory
+    
+    Each paddock's synced range (ndvi_synced_until) is the checkpoint: it is committed
+    as soon as the paddock is done, so an interrupted pass resumes where it stopped and
+    paddocks checked within NDVI_CACHE_REFRESH_SECONDS are skipped.
+    """
+    
+    def __init__(self, lookback_days=None, max_workers=None):
+        config = current_app.config
+        self.app = current_app._get_current_object()
+        self.lookback = timedelta(days=lookback_days or config['NDVI_INGEST_LOOKBACK_DAYS'])
+        self.max_workers = max_workers or config['NDVI_INGEST_CONCURRENCY']
+    
+    def get_paddock_ids(self):
+        """
+        Get the IDs of paddocks registered with Agromonitoring, least recently synced first
+        
+        Returns:
+            list: Paddock IDs
+        """
+        query = db.session.query(Paddock.id).filter(Paddock.agromonitoring_id.isnot(None))
+        return [
+            paddock_id for paddock_id, in
+            query.order_by(Paddock.ndvi_synced_until.asc().nullsfirst(), Paddock.id)
+        ]
+    
+    def ingest_paddock(self, paddock_id):
+        """
+        Fetch scenes and statistics published since a paddock was last synced
+        
+        Args:
+            paddock_id (UUID): ID of the paddock
+        
+        Returns:
+            tuple: ('synced', 'skipped' or 'failed', scene counts from NDVICache.sync or None)
+        """
+        with self.app.app_context():
+            try:
+                paddock = db.session.get(Paddock, paddock_id)
+                if not paddock or not paddock.agromonitoring_id:
+                    return 'skipped', None
+                
+                end_date = datetime.utcnow()
+                start_date = min(end_date - self.lookback, paddock.ndvi_synced_from or end_date)
+                counts = NDVICache().sync(paddock, start_date, end_date)
+                return ('synced' if counts['ranges'] else 'skipped'), counts
+            except Exception as e:
+                db.session.rollback()
+                error_msg = format_exception(e)
+                current_app.logger.error(f"Error ingesting NDVI data for paddock {paddock_id}: {error_msg}")
+                return 'failed', None
+    
+    def run(self, paddock_ids=None):
+        """
+        Run one ingestion pass
+        
+        Paddocks are processed on a dedicated pool, separate from the upstream executor
+        that each paddock's sync uses, so nested waits cannot exhaust either pool.
+        
+        Args:
+            paddock_ids (list, optional): Paddocks to ingest, defaults to every registered paddock
+        
+        Returns:
+            dict: Number of paddocks per outcome and of scenes inserted, updated and unchanged
+        """
+        if paddock_ids is None:
+            paddock_ids = self.get_paddock_ids()
+        
+        summary = {
+            'synced': 0, 'skipped': 0, 'failed': 0,
+            'scenes_inserted': 0, 'scenes_updated': 0, 'scenes_unchanged': 0
+        }
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ndvi-ingest') as executor:
+            for outcome, counts in executor.map(self.ingest_paddock, paddock_ids):
+                summary[outcome] += 1
+                for key in ('inserted', 'updated', 'unchanged'):
+                    summary[f'scenes_{key}'] += counts[key] if counts else 0
+        
+        logger.info(
+            "NDVI ingestion finished: %d synced, %d skipped, %d failed; scenes %d inserted, %d updated, %d unchanged",
+            summary['synced'], summary['skipped'], summary['failed'],
+            summary['scenes_inserted'], summary['scenes_updated'], summary['scenes_unchanged']
+        )
+        return summary
+
+def run_ingestion(paddock_ids=None, lookback_days=None, max_workers=None):
+    """
+    Run one ingestion pass unless another process is already running one
+    
+    Args:
+        paddock_ids (list, optional): Paddocks to ingest, defaults to every registered paddock
+        lookback_days (int, optional): How far back to fetch for paddocks never synced
+        max_workers (int, optional): Paddocks processed concurrently
+    
+    Returns:
+        dict: Number of paddocks per outcome, or None if another pass is running
+    """
+    with ingest_lock(current_app.config['NDVI_INGEST_LOCK_PATH']) as acquired:
+        if not acquired:
+            logger.info("NDVI ingestion already running in another process")
+            return None
+        return NDVIIngestor(lookback_days, max_workers).run(paddock_ids)
+
+def start_ingest_worker(app):
+    """
+    Start a daemon thread that runs an ingestion pass every NDVI_INGEST_INTERVAL_SECONDS
+    
+    Args:
+        app: Flask application
+    
+    Returns:
+        threading.Thread: The worker thread
+    """
+    interval = app.config['NDVI_INGEST_INTERVAL_SECONDS']
+    
+    def loop():
+        while True:
+            with app.app_context():
+                try:
+                    run_ingestion()
+                except Exception as e:
+                    error_msg = format_exception(e)
+                    app.logger.error(f"Error in NDVI ingestion worker: {error_msg}")
+            time.sleep(interval)
+    
+    thread = threading.Thread(target=loop, name='ndvi-ingest-worker', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,95 @@
+from flask import current_app
+from sqlalchemy import and_, case, func, select
+
+from app import db
+from app.models.ndvi import NDVIHistory
+from app.models.paddock import Paddock
+from app.utils.helpers import NDVI_HEALTH_THRESHOLDS
+
+def ndvi_summary_statement(trend_scenes, trend_threshold, max_clouds=None):
+    """
+    Build the query that summarises the latest NDVI of every paddock
+    
+    Window functions rank each paddock's scenes newest first and average the scenes
+    before the latest one, so the whole farm is summarised in one pass over
+    ndvi_history using the (paddock_id, date) index.
+    
+    Args:
+        trend_scenes (int): Earlier scenes averaged to measure the trend
+        trend_threshold (float): NDVI change counted as improving or declining
+        max_clouds (float, optional): Ignore scenes with more cloud cover than this percentage
+    
+    Returns:
+        Select: One row per paddock, with nulls for paddocks without NDVI data
+    """
+    window = {'partition_by': NDVIHistory.paddock_id, 'order_by': NDVIHistory.date.desc()}
+    scenes = select(
+        NDVIHistory.paddock_id,
+        NDVIHistory.date,
+        NDVIHistory.ndvi_value,
+        func.row_number().over(**window).label('rank'),
+        func.avg(NDVIHistory.ndvi_value).over(rows=(1, trend_scenes), **window).label('previous_mean'),
+        func.count().over(partition_by=NDVIHistory.paddock_id).label('scenes')
+    ).where(NDVIHistory.ndvi_value.isnot(None))
+    if max_clouds is not None:
+        scenes = scenes.where((NDVIHistory.clouds <= max_clouds) | NDVIHistory.clouds.is_(None))
+    latest = scenes.subquery('latest')
+    
+    change = latest.c.ndvi_value - latest.c.previous_mean
+    low, high = NDVI_HEALTH_THRESHOLDS
+    return select(
+        Paddock.id,
+        Paddock.name,
+        latest.c.date,
+        latest.c.ndvi_value,
+        latest.c.previous_mean,
+        change.label('change'),
+        case(
+            (latest.c.ndvi_value.is_(None), 'Unknown'),
+            (latest.c.ndvi_value < low, 'Low'),
+            (latest.c.ndvi_value < high, 'Medium'),
+            else_='High'
+        ).label('health'),
+        case(
+            (latest.c.previous_mean.is_(None), 'unknown'),
+            (change > trend_threshold, 'improving'),
+            (change < -trend_threshold, 'declining'),
+            else_='stable'
+        ).label('trend'),
+        func.coalesce(latest.c.scenes, 0).label('scenes')
+    ).select_from(Paddock).outerjoin(
+        latest, and_(latest.c.paddock_id == Paddock.id, latest.c.rank == 1)
+    ).order_by(Paddock.created_at, Paddock.id)
+
+def get_ndvi_summary(max_clouds=None):
+    """
+    Summarise the latest NDVI, trend and health of every paddock from cached history
+    
+    Args:
+        max_clouds (float, optional): Ignore scenes with more cloud cover than this percentage,
+            defaults to NDVI_MAX_CLOUDS
+    
+    Returns:
+        dict: Summary per paddock and the number of paddocks per health status
+    """
+    config = current_app.config
+    if max_clouds is None:
+        max_clouds = config['NDVI_MAX_CLOUDS']
+    statement = ndvi_summary_statement(config['NDVI_TREND_SCENES'], config['NDVI_TREND_THRESHOLD'], max_clouds)
+    
+    paddocks = []
+    health_counts = {'High': 0, 'Medium': 0, 'Low': 0, 'Unknown': 0}
+    for row in db.session.execute(statement):
+        health_counts[row.health] += 1
+        paddocks.append({
+            'paddock_id': str(row.id),
+            'name': row.name,
+            'date': row.date.isoformat() if row.date else None,
+            'ndvi': row.ndvi_value,
+            'previous_mean': row.previous_mean,
+            'change': row.change,
+            'trend': row.trend,
+            'health': row.health,
+            'scenes': row.scenes
+        })
+    return {'paddocks': paddocks, 'health': health_counts}
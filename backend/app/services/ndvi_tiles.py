@@ -0,0 +1,72 @@
+import re
+import threading
+from flask import current_app, request
+
+from app.services.agromonitoring import AgromonitoringService
+from app.services.tile_cache import DiskTileCache
+
+# Preset codes and image IDs are hex strings; anything else could escape the cache directory
+TILE_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+_tile_cache = None
+_tile_cache_lock = threading.Lock()
+
+def get_ndvi_tile_cache():
+    """
+    Get the process-wide NDVI tile cache
+    
+    The cache object keeps a running size total, so one instance is shared by all threads.
+    
+    Returns:
+        DiskTileCache: The shared cache
+    """
+    global _tile_cache
+    if _tile_cache is None:
+        with _tile_cache_lock:
+            if _tile_cache is None:
+                _tile_cache = DiskTileCache(
+                    current_app.config['NDVI_TILE_CACHE_DIR'],
+                    '.png',
+                    max_bytes=current_app.config['NDVI_TILE_CACHE_MAX_BYTES']
+                )
+    return _tile_cache
+
+def get_ndvi_tile(z, x, y, preset_code, image_id):
+    """
+    Get an NDVI raster tile, fetching it from Agromonitoring on a cache miss
+    
+    Tiles for a scene never change, so cached tiles are kept until evicted.
+    
+    Args:
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+        preset_code (str): Agromonitoring preset code
+        image_id (str): Agromonitoring image ID
+    
+    Returns:
+        bytes: PNG tile
+    """
+    if not TILE_KEY_PATTERN.match(preset_code) or not TILE_KEY_PATTERN.match(image_id):
+        raise ValueError("Invalid preset code or image ID")
+    
+    cache = get_ndvi_tile_cache()
+    namespace = (preset_code, image_id)
+    tile = cache.get(z, x, y, namespace)
+    if tile is None:
+        tile = AgromonitoringService().get_ndvi_tile(z, x, y, preset_code, image_id)
+        cache.put(z, x, y, tile, namespace)
+    return tile
+
+def get_ndvi_tile_proxy_url(preset_code, image_id):
+    """
+    Get the tile URL template served by our tile proxy for an NDVI image
+    
+    Args:
+        preset_code (str): Agromonitoring preset code
+        image_id (str): Agromonitoring image ID
+    
+    Returns:
+        str: Tile URL template with {z}/{x}/{y} placeholders and no API key
+    """
+    return f"{request.host_url.rstrip('/')}/api/ndvi/tiles/{{z}}/{{x}}/{{y}}/{preset_code}/{image_id}"
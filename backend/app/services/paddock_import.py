@@ -0,0 +1,372 @@
+import copy
+import io
+import json
+import logging
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import shapely
+from flask import current_app
+from pyproj import CRS, Transformer
+from requests.exceptions import HTTPError
+from shapely.geometry import mapping, shape
+from sqlalchemy import insert, select, update
+
+from app import db
+from app.models.paddock import Paddock
+from app.models.paddock_geometry import PaddockGeometryLevel
+from app.services.agromonitoring import AgromonitoringService
+from app.services.geometry import build_geometry_levels, calculate_areas, calculate_bounds, calculate_centroids
+from app.services.paddock_tiles import get_tile_cache
+from app.utils.helpers import format_exception, redact_api_key
+
+try:
+    import shapefile
+except ImportError:  # pragma: no cover - pyshp is optional
+    shapefile = None
+
+logger = logging.getLogger(__name__)
+
+NAME_PROPERTIES = ('name', 'Name', 'NAME', 'paddock', 'Paddock', 'PADDOCK')
+
+def read_feature_collection(data):
+    """
+    Get the features of a GeoJSON FeatureCollection
+    
+    Args:
+        data (dict or str or bytes): FeatureCollection
+    
+    Returns:
+        list: GeoJSON features
+    
+    Raises:
+        ValueError: If the input is not a FeatureCollection
+    """
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError("Invalid GeoJSON format") from e
+    if not isinstance(data, dict) or data.get('type') != 'FeatureCollection':
+        raise ValueError("GeoJSON must be a FeatureCollection")
+    if not isinstance(data.get('features'), list):
+        raise ValueError("FeatureCollection must contain a features list")
+    return data['features']
+
+def read_shapefile_zip(fileobj):
+    """
+    Read the polygons of a zipped shapefile as GeoJSON features in EPSG:4326
+    
+    Args:
+        fileobj: Binary file object holding the zip archive
+    
+    Returns:
+        list: GeoJSON features
+    
+    Raises:
+        ValueError: If pyshp is not installed or the archive holds no shapefile
+    """
+    if shapefile is None:
+        raise ValueError("Shapefile import requires the pyshp package")
+    
+    with zipfile.ZipFile(fileobj) as archive:
+        members = {name.lower(): name for name in archive.namelist()}
+        shp_name = next((name for name in members if name.endswith('.shp')), None)
+        if shp_name is None:
+            raise ValueError("Zip archive does not contain a .shp file")
+        stem = shp_name[:-4]
+        
+        def member(extension):
+            name = members.get(stem + extension)
+            return io.BytesIO(archive.read(name)) if name else None
+        
+        prj = member('.prj')
+        reader = shapefile.Reader(shp=member('.shp'), shx=member('.shx'), dbf=member('.dbf'))
+    
+    # Reproject unless the shapefile is already in geographic WGS84 coordinates
+    transformer = None
+    if prj is not None:
+        crs = CRS.from_wkt(prj.read().decode('utf-8', errors='replace'))
+        if not crs.equals(CRS.from_epsg(4326), ignore_axis_order=True):
+            transformer = Transformer.from_crs(crs, 4326, always_xy=True)
+    
+    features = []
+    for record in reader.shapeRecords():
+        geometry = record.shape.__geo_interface__
+        if transformer is not None:
+            geometry = mapping(
+                shapely.transform(shape(geometry), lambda coords: np.column_stack(
+                    transformer.transform(coords[:, 0], coords[:, 1])
+                ))
+            )
+        features.append({'type': 'Feature', 'properties': record.record.as_dict(), 'geometry': geometry})
+    return features
+
+def get_feature_name(feature, index, name_property=None):
+    properties = feature.get('properties') or {}
+    for key in ((name_property,) if name_property else NAME_PROPERTIES):
+        value = properties.get(key)
+        if value not in (None, ''):
+            return str(value)[:255]
+    return f"Paddock {index + 1}"
+
+def validate_features(features):
+    """
+    Check every feature is a valid polygon, parsing all geometries in one vectorized pass
+    
+    Args:
+        features (list): GeoJSON features
+    
+    Returns:
+        tuple: (geometries, errors) where geometries is an array of shapely polygons
+            and errors maps feature index to a message
+    """
+    errors = {}
+    texts = []
+    for index, feature in enumerate(features):
+        geometry = feature.get('geometry') if isinstance(feature, dict) else None
+        if not isinstance(geometry, dict):
+            errors[index] = 'Feature has no geometry'
+            texts.append(None)
+        elif geometry.get('type') != 'Polygon':
+            errors[index] = 'GeoJSON must be of type Polygon'
+            texts.append(None)
+        else:
+            texts.append(json.dumps(geometry))
+    
+    geometries = shapely.from_geojson(texts, on_invalid='ignore')
+    missing = shapely.is_missing(geometries)
+    empty = shapely.is_empty(geometries) & ~missing
+    valid = shapely.is_valid(geometries)
+    bounds = shapely.bounds(geometries)
+    in_range = (
+        (bounds[:, 0] >= -180) & (bounds[:, 2] <= 180)
+        & (bounds[:, 1] >= -90) & (bounds[:, 3] <= 90)
+    )
+    
+    for index in range(len(features)):
+        if index in errors:
+            continue
+        if missing[index]:
+            errors[index] = 'Invalid GeoJSON format'
+        elif empty[index]:
+            errors[index] = 'Polygon is empty'
+        elif not valid[index]:
+            errors[index] = f"Invalid polygon: {shapely.is_valid_reason(geometries[index])}"
+        elif not in_range[index]:
+            errors[index] = 'Coordinates must be longitude/latitude in EPSG:4326'
+    return geometries, errors
+
+def describe_registration_error(error):
+    """
+    Describe a failed registration without the request URL, which carries the API key
+    
+    Args:
+        error (Exception): Error raised while creating the polygon
+    
+    Returns:
+        str: Upstream status code and message, or the redacted exception
+    """
+    if isinstance(error, HTTPError) and error.response is not None:
+        try:
+            message = error.response.json().get('message')
+        except (ValueError, AttributeError):
+            message = None
+        status = error.response.status_code
+        return f"Agromonitoring returned {status}: {message}" if message else f"Agromonitoring returned {status}"
+    return redact_api_key(format_exception(error))
+
+class PaddockImporter:
+    """Creates paddocks in bulk and registers them with Agromonitoring concurrently"""
+    
+    def __init__(self, agro_service=None, rate_limit_wait=None):
+        self.app = current_app._get_current_object()
+        self.agro_service = agro_service or AgromonitoringService()
+        if rate_limit_wait is not None:
+            # Queued registrations wait for quota much longer than interactive requests. A copy
+            # keeps the wait of a service shared with other callers; it still shares the limiter
+            self.agro_service = copy.copy(self.agro_service)
+            self.agro_service.rate_limit_wait = rate_limit_wait
+        self.batch_size = current_app.config['PADDOCK_IMPORT_BATCH_SIZE']
+        self.max_workers = current_app.config['PADDOCK_IMPORT_CONCURRENCY']
+    
+    def insert_paddocks(self, rows):
+        """
+        Insert paddocks and their simplified geometries with batched executemany statements
+        
+        Args:
+            rows (list): Paddock column dicts
+        """
+        tolerances = current_app.config['GEOMETRY_LOD_TOLERANCES']
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            db.session.execute(insert(Paddock), batch)
+            
+            levels = [
+                {
+                    'paddock_id': row['id'],
+                    'level': level,
+                    'tolerance': tolerance,
+                    'geometry': json.dumps(simplified),
+                    'vertex_count': vertex_count
+                }
+                for row in batch
+                for level, tolerance, simplified, vertex_count in build_geometry_levels(row['geometry'], tolerances)
+            ]
+            if levels:
+                db.session.execute(insert(PaddockGeometryLevel), levels)
+        db.session.commit()
+    
+    def register_polygon(self, name, geometry):
+        with self.app.app_context():
+            try:
+                response = self.agro_service.create_polygon(name, geometry)
+                return response.get('id'), None
+            except Exception as e:
+                return None, describe_registration_error(e)
+    
+    def register_paddocks(self, rows):
+        """
+        Register paddocks with Agromonitoring through a bounded pool
+        
+        Requests go through the shared rate limiter, so the pool size only caps how
+        many are in flight at once.
+        
+        Args:
+            rows (list): Dicts with the paddock id, name and geometry
+        
+        Returns:
+            list: (agromonitoring_id, error) for each row
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='paddock-import') as executor:
+            results = list(executor.map(
+                lambda row: self.register_polygon(row['name'], row['geometry']), rows
+            ))
+        
+        updates = [
+            {'id': row['id'], 'agromonitoring_id': polygon_id}
+            for row, (polygon_id, _) in zip(rows, results) if polygon_id
+        ]
+        for start in range(0, len(updates), self.batch_size):
+            db.session.execute(update(Paddock), updates[start:start + self.batch_size])
+        db.session.commit()
+        return results
+    
+    def run(self, features, register=True, name_property=None):
+        """
+        Import features as paddocks
+        
+        Invalid features are reported and skipped; the valid ones are still imported.
+        
+        Args:
+            features (list): GeoJSON features
+            register (bool): Register the new paddocks with Agromonitoring
+            name_property (str, optional): Feature property holding the paddock name
+        
+        Returns:
+            dict: Counts per outcome and a status entry for every feature
+        """
+        geometries, errors = validate_features(features)
+        statuses = [{'index': index} for index in range(len(features))]
+        
+        # Areas, centroids and bounds for every valid polygon in vectorized calls
+        valid = geometries[[index not in errors for index in range(len(features))]]
+        locations = iter(zip(
+            calculate_areas(valid).tolist(),
+            calculate_centroids(valid).tolist(),
+            calculate_bounds(valid).tolist()
+        ))
+        
+        # Spread creation times so the paddock list keeps the file order
+        now = datetime.utcnow()
+        rows = []
+        for index, feature in enumerate(features):
+            status = statuses[index]
+            if index in errors:
+                status.update(status='invalid', error=errors[index])
+                continue
+            created_at = now + timedelta(microseconds=len(rows))
+            area, (centroid_lon, centroid_lat), (min_lon, min_lat, max_lon, max_lat) = next(locations)
+            rows.append({
+                'id': uuid.uuid4(),
+                'name': get_feature_name(feature, index, name_property),
+                'geometry': json.dumps(feature['geometry']),
+                'area': area,
+                'centroid_lat': centroid_lat,
+                'centroid_lon': centroid_lon,
+                'min_lon': min_lon,
+                'min_lat': min_lat,
+                'max_lon': max_lon,
+                'max_lat': max_lat,
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+            status.update(status='created', id=str(rows[-1]['id']), name=rows[-1]['name'])
+        
+        if rows:
+            self.insert_paddocks(rows)
+            get_tile_cache().invalidate_bounds(tuple(shapely.total_bounds(valid)))
+        
+        registered = failed = 0
+        if rows and register:
+            created = [status for status in statuses if status.get('status') == 'created']
+            for status, (polygon_id, error) in zip(created, self.register_paddocks(rows)):
+                if polygon_id:
+                    status['agromonitoring_id'] = polygon_id
+                    registered += 1
+                else:
+                    status['registration_error'] = error
+                    failed += 1
+        
+        logger.info(
+            "Imported %d paddocks (%d invalid, %d registered, %d registration failures)",
+            len(rows), len(errors), registered, failed
+        )
+        return {
+            'created': len(rows),
+            'invalid': len(errors),
+            'registered': registered,
+            'registration_failed': failed,
+            'features': statuses
+        }
+
+def start_registration(app, paddock_ids, rate_limit_wait=None):
+    """
+    Register imported paddocks with Agromonitoring on a daemon thread
+    
+    Paddocks still unregistered if the process stops early are picked up by
+    `flask paddocks register`.
+    
+    Args:
+        app: Flask application
+        paddock_ids (list): IDs of the paddocks to register
+        rate_limit_wait (float, optional): Seconds each registration may wait for quota,
+            defaults to AGROMONITORING_RATE_LIMIT_WAIT
+    
+    Returns:
+        threading.Thread: The registration thread
+    """
+    def register():
+        with app.app_context():
+            try:
+                rows = [
+                    row._asdict() for row in db.session.execute(
+                        select(Paddock.id, Paddock.name, Paddock.geometry).where(
+                            Paddock.id.in_(paddock_ids), Paddock.agromonitoring_id.is_(None)
+                        )
+                    )
+                ]
+                results = PaddockImporter(rate_limit_wait=rate_limit_wait).register_paddocks(rows)
+                failed = sum(1 for _, error in results if error)
+                logger.info("Registered %d imported paddocks, %d failed", len(rows) - failed, failed)
+            except Exception as e:
+                db.session.rollback()
+                error_msg = redact_api_key(format_exception(e))
+                app.logger.error(f"Error registering imported paddocks: {error_msg}")
+    
+    thread = threading.Thread(target=register, name='paddock-registration', daemon=True)
+    thread.start()
+    return thread
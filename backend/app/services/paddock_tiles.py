@@ -0,0 +1,111 @@
+import json
+from flask import current_app
+from shapely.geometry import shape
+from sqlalchemy import text
+from sqlalchemy.orm import load_only
+
+from app import db
+from app.models.paddock import Paddock
+from app.models.types import is_postgis
+from app.services.mvt import encode_tile, tile_bounds
+from app.services.spatial_index import filter_paddocks_by_bbox
+from app.services.tile_cache import DiskTileCache
+
+LAYER_NAME = 'paddocks'
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+POSTGIS_TILE_SQL = text("""
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+    ),
+    features AS (
+        SELECT
+            ST_AsMVTGeom(ST_Transform(p.geometry, 3857), bounds.geom, :extent, :buffer, true) AS geom,
+            p.id::text AS id,
+            p.name,
+            p.area
+        FROM paddocks p, bounds
+        WHERE p.geometry && ST_Transform(bounds.geom, 4326)
+    )
+    SELECT ST_AsMVT(features.*, :layer, :extent, 'geom') FROM features
+""")
+
+def get_tile_cache():
+    return DiskTileCache(current_app.config['PADDOCK_TILE_CACHE_DIR'], '.mvt')
+
+def render_paddock_tile(z, x, y):
+    """
+    Render paddock boundaries as a Mapbox Vector Tile
+    
+    Uses PostGIS ST_AsMVT when available, otherwise encodes the tile in Python.
+    
+    Args:
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+    
+    Returns:
+        bytes: Protobuf encoded tile
+    """
+    if is_postgis(db.engine):
+        tile = db.session.execute(POSTGIS_TILE_SQL, {
+            'z': z, 'x': x, 'y': y,
+            'extent': TILE_EXTENT, 'buffer': TILE_BUFFER, 'layer': LAYER_NAME
+        }).scalar()
+        return bytes(tile) if tile else b''
+    
+    # Widen the query by the tile buffer so edge geometry is not cut short
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    pad_lon = (max_lon - min_lon) * TILE_BUFFER / TILE_EXTENT
+    pad_lat = (max_lat - min_lat) * TILE_BUFFER / TILE_EXTENT
+    bbox = (
+        max(min_lon - pad_lon, -180), max(min_lat - pad_lat, -90),
+        min(max_lon + pad_lon, 180), min(max_lat + pad_lat, 90)
+    )
+    
+    query = Paddock.query.options(load_only(Paddock.id, Paddock.name, Paddock.area, Paddock.geometry))
+    features = [
+        (shape(json.loads(paddock.geometry)), {'id': str(paddock.id), 'name': paddock.name, 'area': paddock.area})
+        for paddock in filter_paddocks_by_bbox(query, bbox)
+    ]
+    return encode_tile(LAYER_NAME, features, z, x, y, TILE_EXTENT, TILE_BUFFER)
+
+def get_paddock_tile(z, x, y):
+    """
+    Get a paddock vector tile from the disk cache, rendering it on a miss
+    
+    Args:
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+    
+    Returns:
+        bytes: Protobuf encoded tile
+    """
+    cache = get_tile_cache()
+    tile = cache.get(z, x, y)
+    if tile is None:
+        tile = render_paddock_tile(z, x, y)
+        cache.put(z, x, y, tile)
+    return tile
+
+def invalidate_paddock_tiles(*geometries):
+    """
+    Drop cached tiles that show any of the given paddock geometries
+    
+    Args:
+        *geometries (dict or str): GeoJSON polygons, e.g. the old and new geometry of an edited paddock
+    
+    Returns:
+        int: Number of tiles deleted
+    """
+    cache = get_tile_cache()
+    deleted = 0
+    for geojson in geometries:
+        if not geojson:
+            continue
+        if isinstance(geojson, str):
+            geojson = json.loads(geojson)
+        deleted += cache.invalidate_bounds(shape(geojson).bounds)
+    return deleted
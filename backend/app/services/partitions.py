@@ -0,0 +1,172 @@
+import logging
+import re
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import text
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on their date column
+PARTITIONED_TABLES = ('ndvi_history', 'weather_data')
+
+# Held for the length of a maintenance transaction so concurrent workers do not race
+PARTITION_LOCK_ID = 7305114
+
+_PARTITION_NAME = re.compile(r'_(\d{4})_(\d{2})$')
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y_%m}"
+
+def partition_month(name):
+    """
+    Get the month a partition covers from its name
+    
+    Args:
+        name (str): Partition table name
+    
+    Returns:
+        datetime: First day of the month, or None for the default partition
+    """
+    match = _PARTITION_NAME.search(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+def is_partitioned(connection, table):
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {'table': table}
+    ).scalar()
+
+def get_partitions(connection, table):
+    """
+    Get the names of a table's partitions
+    
+    Args:
+        connection: SQLAlchemy connection
+        table (str): Partitioned table
+    
+    Returns:
+        set: Partition table names
+    """
+    return set(connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {'table': table}).scalars())
+
+def create_month_partition(connection, table, month):
+    """
+    Create the partition for one month, moving any of its rows out of the default partition
+    
+    Args:
+        connection: SQLAlchemy connection
+        table (str): Partitioned table
+        month (datetime): First day of the month
+    """
+    name = partition_name(table, month)
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    in_month = {'start': month, 'end': add_months(month, 1)}
+    
+    stranded = connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE date >= :start AND date < :end)"
+    ), in_month).scalar()
+    if not stranded:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+    
+    # Rows written before the partition existed landed in the default partition,
+    # which would block attaching a partition for their month
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE date >= :start AND date < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), in_month)
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+def ensure_partitions(connection, table, start, end):
+    """
+    Create the default partition and monthly partitions covering a date range
+    
+    Args:
+        connection: SQLAlchemy connection
+        table (str): Partitioned table
+        start (datetime): Earliest date to cover
+        end (datetime): Latest date to cover
+    
+    Returns:
+        list: Names of the partitions created
+    """
+    existing = get_partitions(connection, table)
+    created = []
+    if f"{table}_default" not in existing:
+        connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+        created.append(f"{table}_default")
+    
+    month = month_start(start)
+    while month <= end:
+        if partition_name(table, month) not in existing:
+            create_month_partition(connection, table, month)
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+def drop_partitions_before(connection, table, cutoff):
+    """
+    Drop monthly partitions whose whole month is before a cutoff
+    
+    Args:
+        connection: SQLAlchemy connection
+        table (str): Partitioned table
+        cutoff (datetime): Rows before this date are no longer needed
+    
+    Returns:
+        list: Names of the partitions dropped
+    """
+    dropped = []
+    for name in sorted(get_partitions(connection, table)):
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+def maintain_partitions(months_ahead=None, now=None):
+    """
+    Make sure every partitioned table has partitions from this month to months_ahead
+    
+    Does nothing on databases other than PostgreSQL, where the tables are not partitioned.
+    
+    Args:
+        months_ahead (int, optional): Months to create in advance, defaults to PARTITION_MONTHS_AHEAD
+        now (datetime, optional): Current time, defaults to utcnow
+    
+    Returns:
+        list: Names of the partitions created
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return []
+    
+    if months_ahead is None:
+        months_ahead = current_app.config['PARTITION_MONTHS_AHEAD']
+    this_month = month_start(now or datetime.utcnow())
+    
+    created = []
+    with db.engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {'id': PARTITION_LOCK_ID})
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(connection, table):
+                created += ensure_partitions(connection, table, this_month, add_months(this_month, months_ahead))
+    
+    if created:
+        logger.info("Created partitions: %s", ', '.join(created))
+    return created
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+class RateLimitExceeded(Exception):
+    """Raised when a request could not be admitted by the rate limiter in time"""
+
+class SQLiteRateLimiter:
+    """
+    Token bucket shared by every worker process on a host
+    
+    The bucket state lives in a small SQLite file and is updated inside a
+    BEGIN IMMEDIATE transaction, so concurrent processes take turns.
+    """
+    
+    def __init__(self, path, rate_per_minute, burst, name='agromonitoring'):
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.name = name
+        self._local = threading.local()
+    
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def _take(self):
+        """
+        Try to take one token from the bucket
+        
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (self.name,)).fetchone()
+            if row is None:
+                tokens = float(self.burst)
+            else:
+                tokens = min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                (self.name, tokens, now)
+            )
+            conn.execute('COMMIT')
+            return wait
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    
+    def acquire(self, timeout=None):
+        """
+        Block until a request may be sent
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever
+        
+        Returns:
+            bool: True if a token was acquired, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+def get_rate_limiter():
+    """
+    Get the Agromonitoring rate limiter for this process
+    
+    Returns:
+        SQLiteRateLimiter: The limiter, or None if rate limiting is disabled
+    """
+    global _limiter
+    rate = current_app.config['AGROMONITORING_RATE_LIMIT']
+    if rate <= 0:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = SQLiteRateLimiter(
+                    current_app.config['AGROMONITORING_RATE_LIMIT_PATH'],
+                    rate,
+                    current_app.config['AGROMONITORING_RATE_LIMIT_BURST']
+                )
+    return _limiter
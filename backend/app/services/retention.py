@@ -0,0 +1,196 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import case, delete, func, literal, null, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.ndvi import NDVIHistory
+from app.models.weather import WeatherData, WeatherSummary
+from app.services.partitions import drop_partitions_before, is_partitioned
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = [
+    'grid_cell', 'period', 'period_start', 'lat', 'lon',
+    'temperature_mean', 'temperature_min', 'temperature_max',
+    'rainfall_mean', 'rainfall_max', 'observations'
+]
+
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.000000'
+
+def period_start(column, period, dialect):
+    """
+    Truncate a datetime column to the start of its day or ISO week (Monday)
+    
+    Args:
+        column: Datetime column or expression
+        period (str): 'day' or 'week'
+        dialect (str): Database dialect name
+    
+    Returns:
+        SQL expression for the start of the period
+    """
+    if dialect == 'postgresql':
+        return func.date_trunc(period, column)
+    # Same text format SQLAlchemy stores datetimes in on SQLite, so comparisons stay correct
+    if period == 'week':
+        # Step back six days, then forward to the next Monday
+        return func.strftime(SQLITE_DATETIME_FORMAT, column, 'start of day', '-6 days', 'weekday 1')
+    return func.strftime(SQLITE_DATETIME_FORMAT, column, 'start of day')
+
+def insert_ignoring_duplicates(model, dialect):
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    return insert(model).on_conflict_do_nothing()
+
+class RetentionJob:
+    """
+    Bounds the size of the time-series tables
+    
+    Weather readings are downsampled into daily summaries after WEATHER_DOWNSAMPLE_DAYS
+    and daily summaries into weekly ones after WEATHER_WEEKLY_DAYS. Raw JSON payloads
+    are dropped sooner: weather forecasts after WEATHER_RAW_RETENTION_DAYS and NDVI
+    scene statistics after NDVI_RAW_RETENTION_DAYS. Each step only touches rows older
+    than its cutoff, so the job can be re-run at any time.
+    """
+    
+    def __init__(self, now=None):
+        config = current_app.config
+        self.now = now or datetime.utcnow()
+        self.dialect = db.engine.dialect.name
+        self.weather_raw_cutoff = self.now - timedelta(days=config['WEATHER_RAW_RETENTION_DAYS'])
+        self.ndvi_raw_cutoff = self.now - timedelta(days=config['NDVI_RAW_RETENTION_DAYS'])
+        
+        # Align to whole days and weeks so a period is never summarised twice
+        daily = (self.now - timedelta(days=config['WEATHER_DOWNSAMPLE_DAYS'])).date()
+        weekly = (self.now - timedelta(days=config['WEATHER_WEEKLY_DAYS'])).date()
+        self.daily_cutoff = datetime.combine(daily, datetime.min.time())
+        self.weekly_cutoff = datetime.combine(weekly - timedelta(days=weekly.weekday()), datetime.min.time())
+    
+    def drop_raw_payloads(self):
+        """
+        Clear old weather forecast and NDVI statistics JSON, keeping the scalar columns
+        
+        Returns:
+            dict: Rows cleared per table
+        """
+        weather = db.session.execute(
+            update(WeatherData)
+            .where(WeatherData.date < self.weather_raw_cutoff, WeatherData.forecast.isnot(None))
+            .values(forecast=null())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        ndvi = db.session.execute(
+            update(NDVIHistory)
+            .where(NDVIHistory.date < self.ndvi_raw_cutoff, NDVIHistory.statistics.isnot(None))
+            .values(statistics=null())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return {'weather_data': weather, 'ndvi_history': ndvi}
+    
+    def downsample_weather(self):
+        """
+        Summarise raw weather readings before the daily cutoff by grid cell and day, then remove them
+        
+        Returns:
+            dict: Daily summaries written and raw rows removed
+        """
+        start = period_start(WeatherData.date, 'day', self.dialect).label('period_start')
+        grid_cell = func.coalesce(WeatherData.grid_cell, 'unknown')
+        summaries = select(
+            grid_cell,
+            literal('day'),
+            start,
+            func.avg(WeatherData.lat),
+            func.avg(WeatherData.lon),
+            func.avg(WeatherData.temperature),
+            func.min(WeatherData.temperature),
+            func.max(WeatherData.temperature),
+            func.avg(WeatherData.rainfall),
+            func.max(WeatherData.rainfall),
+            func.count()
+        ).where(WeatherData.date < self.daily_cutoff).group_by(grid_cell, start)
+        
+        summarised = db.session.execute(
+            insert_ignoring_duplicates(WeatherSummary, self.dialect).from_select(SUMMARY_COLUMNS, summaries)
+        ).rowcount
+        removed = self.delete_weather_before(self.daily_cutoff)
+        db.session.commit()
+        return {'daily_summaries': summarised, 'weather_rows_removed': removed}
+    
+    def rollup_weekly(self):
+        """
+        Merge daily summaries before the weekly cutoff into weekly summaries
+        
+        Returns:
+            dict: Weekly summaries written and daily summaries removed
+        """
+        daily = WeatherSummary.__table__.alias('daily')
+        start = period_start(daily.c.period_start, 'week', self.dialect).label('period_start')
+        observations = func.sum(daily.c.observations)
+        
+        def weighted_mean(column):
+            # Days with more readings count for more, as if averaging the raw readings
+            weights = func.sum(case((column.isnot(None), daily.c.observations)))
+            return func.sum(column * daily.c.observations) / func.nullif(weights, 0)
+        
+        summaries = select(
+            daily.c.grid_cell,
+            literal('week'),
+            start,
+            func.avg(daily.c.lat),
+            func.avg(daily.c.lon),
+            weighted_mean(daily.c.temperature_mean),
+            func.min(daily.c.temperature_min),
+            func.max(daily.c.temperature_max),
+            weighted_mean(daily.c.rainfall_mean),
+            func.max(daily.c.rainfall_max),
+            observations
+        ).where(
+            daily.c.period == 'day', daily.c.period_start < self.weekly_cutoff
+        ).group_by(daily.c.grid_cell, start)
+        
+        summarised = db.session.execute(
+            insert_ignoring_duplicates(WeatherSummary, self.dialect).from_select(SUMMARY_COLUMNS, summaries)
+        ).rowcount
+        removed = db.session.execute(
+            delete(WeatherSummary).where(
+                WeatherSummary.period == 'day', WeatherSummary.period_start < self.weekly_cutoff
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return {'weekly_summaries': summarised, 'daily_summaries_removed': removed}
+    
+    def delete_weather_before(self, cutoff):
+        """
+        Remove raw weather readings before a cutoff, dropping whole monthly partitions where possible
+        
+        Args:
+            cutoff (datetime): Readings before this date are removed
+        
+        Returns:
+            int: Rows removed by DELETE; dropped partitions are logged, not counted
+        """
+        connection = db.session.connection()
+        if self.dialect == 'postgresql' and is_partitioned(connection, WeatherData.__tablename__):
+            dropped = drop_partitions_before(connection, WeatherData.__tablename__, cutoff)
+            if dropped:
+                logger.info("Dropped weather partitions: %s", ', '.join(dropped))
+        return db.session.execute(
+            delete(WeatherData).where(WeatherData.date < cutoff).execution_options(synchronize_session=False)
+        ).rowcount
+    
+    def run(self):
+        """
+        Run every retention step
+        
+        Returns:
+            dict: Row counts per step
+        """
+        summary = {}
+        summary.update(self.drop_raw_payloads())
+        summary.update(self.downsample_weather())
+        summary.update(self.rollup_weekly())
+        logger.info("Retention finished: %s", summary)
+        return summary
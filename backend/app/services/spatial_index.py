@@ -0,0 +1,66 @@
+import threading
+from shapely import STRtree, box, from_geojson
+from sqlalchemy import func
+
+from app import db
+from app.models.paddock import Paddock
+from app.models.types import is_postgis
+
+class PaddockSpatialIndex:
+    """In-process STRtree over paddock geometries, used when PostGIS is not available"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._ids = []
+        self._tree = None
+    
+    def _current_signature(self):
+        # Any insert, update or delete changes the row count or newest update time
+        return db.session.query(func.count(Paddock.id), func.max(Paddock.updated_at)).one()
+    
+    def _rebuild(self, signature):
+        rows = db.session.query(Paddock.id, Paddock.geometry).all()
+        self._ids = [row.id for row in rows]
+        self._tree = STRtree(from_geojson([row.geometry for row in rows])) if rows else None
+        self._signature = tuple(signature)
+    
+    def query(self, bbox):
+        """
+        Get the IDs of paddocks that intersect a bounding box
+        
+        Args:
+            bbox (tuple): (min_lon, min_lat, max_lon, max_lat)
+        
+        Returns:
+            list: Paddock IDs
+        """
+        signature = tuple(self._current_signature())
+        with self._lock:
+            if signature != self._signature:
+                self._rebuild(signature)
+            if self._tree is None:
+                return []
+            indices = self._tree.query(box(*bbox), predicate='intersects')
+            return [self._ids[index] for index in indices]
+
+_spatial_index = PaddockSpatialIndex()
+
+def filter_paddocks_by_bbox(query, bbox):
+    """
+    Restrict a paddock query to paddocks that intersect a bounding box
+    
+    Uses the PostGIS GiST index when available, otherwise the in-process STRtree.
+    
+    Args:
+        query: SQLAlchemy query over Paddock
+        bbox (tuple): (min_lon, min_lat, max_lon, max_lat)
+    
+    Returns:
+        The filtered query
+    """
+    if is_postgis(db.engine):
+        envelope = func.ST_MakeEnvelope(*bbox, 4326)
+        return query.filter(func.ST_Intersects(Paddock.geometry, envelope))
+    
+    return query.filter(Paddock.id.in_(_spatial_index.query(bbox)))
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+
+from app.services.mvt import tile_range
+
+class DiskTileCache:
+    """
+    Tile cache stored on disk as <root>/[<namespace>/]<z>/<x>/<y><suffix>
+    
+    With max_bytes set the cache is a least-recently-used cache: reads refresh a
+    tile's modification time and the oldest tiles are evicted once the total size
+    goes over the limit.
+    """
+    
+    def __init__(self, root, suffix, max_bytes=None):
+        self.root = root
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+    
+    def path(self, z, x, y, namespace=None):
+        parts = [self.root]
+        if namespace:
+            parts.extend(namespace)
+        return os.path.join(*parts, str(z), str(x), f"{y}{self.suffix}")
+    
+    def get(self, z, x, y, namespace=None):
+        """
+        Read a cached tile
+        
+        Args:
+            z (int): Zoom level
+            x (int): Tile column
+            y (int): Tile row
+            namespace (tuple, optional): Path components placed before the zoom level
+        
+        Returns:
+            bytes: The tile, or None on a cache miss
+        """
+        path = self.path(z, x, y, namespace)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        
+        if self.max_bytes:
+            # Mark the tile as recently used
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return data
+    
+    def put(self, z, x, y, data, namespace=None):
+        """
+        Store a tile, replacing any existing one atomically
+        
+        Args:
+            z (int): Zoom level
+            x (int): Tile column
+            y (int): Tile row
+            data (bytes): Tile contents
+            namespace (tuple, optional): Path components placed before the zoom level
+        """
+        path = self.path(z, x, y, namespace)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        
+        # Write to a temporary file first so readers never see a partial tile
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        if self.max_bytes:
+            self._track(len(data))
+    
+    def _scan(self):
+        tiles = []
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(self.suffix):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                tiles.append((stat.st_mtime, stat.st_size, path))
+        return tiles
+    
+    def _track(self, added):
+        with self._lock:
+            # The running total is per process, so it is re-synced from disk on every eviction
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += added
+            if self._size > self.max_bytes:
+                self._size = self._evict()
+    
+    def _evict(self):
+        tiles = sorted(self._scan())
+        total = sum(size for _, size, _ in tiles)
+        
+        # Evict down to 90% of the limit so a full cache does not rescan on every write
+        target = self.max_bytes * 0.9
+        for _, size, path in tiles:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+    
+    def invalidate_bounds(self, bounds):
+        """
+        Delete every cached tile that overlaps a longitude/latitude box
+        
+        Only zoom levels and columns that exist on disk are scanned.
+        
+        Args:
+            bounds (tuple): (min_lon, min_lat, max_lon, max_lat)
+        
+        Returns:
+            int: Number of tiles deleted
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        
+        deleted = 0
+        for z_entry in os.scandir(self.root):
+            if not z_entry.is_dir() or not z_entry.name.isdigit():
+                continue
+            min_x, min_y, max_x, max_y = tile_range(bounds, int(z_entry.name))
+            
+            for x_entry in os.scandir(z_entry.path):
+                if not x_entry.is_dir() or not x_entry.name.isdigit():
+                    continue
+                if not min_x <= int(x_entry.name) <= max_x:
+                    continue
+                
+                for y_entry in os.scandir(x_entry.path):
+                    y = y_entry.name[:-len(self.suffix)]
+                    if not y_entry.name.endswith(self.suffix) or not y.isdigit():
+                        continue
+                    if min_y <= int(y) <= max_y:
+                        try:
+                            os.remove(y_entry.path)
+                            deleted += 1
+                        except FileNotFoundError:
+                            pass
+        return deleted
@@ -0,0 +1,85 @@
+import uuid
+from flask import current_app
+from sqlalchemy import JSON, cast, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+
+# Columns kept from the first write of a row
+IMMUTABLE_COLUMNS = ('id', 'created_at')
+
+def _insert(table, dialect):
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise ValueError(f"Upserts need PostgreSQL or SQLite, not {dialect}")
+
+def _changed(value, column, dialect):
+    # PostgreSQL json has no equality operator, so compare as jsonb
+    if dialect == 'postgresql' and isinstance(column.type, JSON):
+        value, column = cast(value, postgresql.JSONB), cast(column, postgresql.JSONB)
+    return value.is_distinct_from(column)
+
+def upsert(model, rows, index_elements, update_columns=None, keep_existing=False, batch_size=None):
+    """
+    Insert rows, updating the ones that already exist, with batched INSERT ... ON CONFLICT statements
+    
+    Rows are matched on a unique index, and only rows whose values change are rewritten, so
+    writing the same rows again costs one round trip per batch and no table writes. Rows
+    without an id are given a new one; a returned id that is one of the new ids marks an
+    inserted row, since updates keep the existing id and created_at. Nothing is committed.
+    
+    Args:
+        model: Model with an id column and a unique index on index_elements
+        rows (list): Column dicts, all with the same keys; ids, if given, must be new
+        index_elements (list): Columns of the unique index rows are matched on
+        update_columns (list, optional): Columns written on conflict, defaults to every
+            column in the rows except the matched ones, id and created_at
+        keep_existing (bool): Keep stored values where the new value is None, for rows
+            assembled from partial sources. JSON columns need none_as_null for this
+        batch_size (int, optional): Rows per statement, defaults to UPSERT_BATCH_SIZE
+    
+    Returns:
+        dict: Number of rows inserted, updated and unchanged
+    
+    Raises:
+        ValueError: If the database is not PostgreSQL or SQLite
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not rows:
+        return counts
+    
+    # One row per key, the last one winning, as a statement cannot update a row twice
+    rows = list({tuple(row[column] for column in index_elements): row for row in rows}.values())
+    
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if update_columns is None:
+        update_columns = [
+            column for column in rows[0]
+            if column not in index_elements and column not in IMMUTABLE_COLUMNS
+        ]
+    batch_size = batch_size or current_app.config['UPSERT_BATCH_SIZE']
+    
+    statement = _insert(table, dialect)
+    values = {
+        column: func.coalesce(statement.excluded[column], table.c[column]) if keep_existing
+        else statement.excluded[column]
+        for column in update_columns
+    }
+    statement = statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_=values,
+        where=or_(*(_changed(value, table.c[column], dialect) for column, value in values.items()))
+    ).returning(table.c.id)
+    
+    for start in range(0, len(rows), batch_size):
+        batch = [{'id': uuid.uuid4(), **row} for row in rows[start:start + batch_size]]
+        new_ids = {row['id'] for row in batch}
+        written = db.session.execute(statement, batch).scalars().all()
+        inserted = sum(1 for row_id in written if row_id in new_ids)
+        counts['inserted'] += inserted
+        counts['updated'] += len(written) - inserted
+        counts['unchanged'] += len(batch) - len(written)
+    return counts
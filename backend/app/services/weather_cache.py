@@ -0,0 +1,169 @@
+import math
+from datetime import datetime, timedelta
+from functools import partial
+from flask import current_app
+from sqlalchemy import tuple_
+
+from app import db
+from app.models.weather import WeatherData
+from app.services.agromonitoring import AgromonitoringService
+from app.services.upsert import upsert
+from app.utils.concurrency import run_concurrently
+
+def get_grid_cell(lat, lon, resolution):
+    """
+    Get the grid cell a location falls in
+    
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        resolution (float): Cell size in degrees
+    
+    Returns:
+        tuple: (cell_key, center_lat, center_lon)
+    """
+    row = math.floor(lat / resolution)
+    col = math.floor(lon / resolution)
+    center_lat = round((row + 0.5) * resolution, 6)
+    center_lon = round((col + 0.5) * resolution, 6)
+    return f"{resolution:g}:{row}:{col}", center_lat, center_lon
+
+class WeatherCache:
+    """TTL cache of Agromonitoring weather keyed by a lat/lon grid cell"""
+    
+    def __init__(self, agro_service=None):
+        self.agro_service = agro_service
+        self.ttl = timedelta(seconds=current_app.config['WEATHER_CACHE_TTL_SECONDS'])
+        self.resolution = current_app.config['WEATHER_GRID_DEGREES']
+    
+    def get_cached(self, grid_cell, now=None):
+        """
+        Get the newest weather record for a grid cell that is still fresh
+        
+        Args:
+            grid_cell (str): Cell key from get_grid_cell
+            now (datetime, optional): Current time, defaults to utcnow
+        
+        Returns:
+            WeatherData: The cached record, or None
+        """
+        now = now or datetime.utcnow()
+        return WeatherData.query.filter(
+            WeatherData.grid_cell == grid_cell,
+            WeatherData.fetched_at >= now - self.ttl
+        ).order_by(WeatherData.date.desc()).first()
+    
+    def get(self, lat, lon):
+        """
+        Get weather for a location, fetching it upstream on a cache miss
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+        
+        Returns:
+            WeatherData: The cached or newly stored record, or None if the upstream call failed
+        """
+        grid_cell, center_lat, center_lon = get_grid_cell(lat, lon, self.resolution)
+        record = self.get_cached(grid_cell)
+        if record:
+            return record
+        
+        # Query the cell center so every location in the cell shares the same data
+        agro_service = self.agro_service or AgromonitoringService()
+        weather_data = agro_service.get_weather(center_lat, center_lon)
+        if not weather_data:
+            return None
+        
+        record, = self.store([(grid_cell, center_lat, center_lon, weather_data)])
+        db.session.commit()
+        return record
+    
+    def get_many(self, locations):
+        """
+        Get weather for many locations, fetching the uncached grid cells concurrently
+        
+        Locations in the same grid cell share one cache lookup and one upstream call.
+        
+        Args:
+            locations (list): (lat, lon) pairs
+        
+        Returns:
+            tuple: (cells, records) where cells is the cell key of each location and
+                records maps cell keys to WeatherData, or None if the upstream call failed
+        """
+        cells = []
+        centers = {}
+        for lat, lon in locations:
+            grid_cell, center_lat, center_lon = get_grid_cell(lat, lon, self.resolution)
+            cells.append(grid_cell)
+            centers[grid_cell] = (center_lat, center_lon)
+        if not centers:
+            return cells, {}
+        
+        # Newest fresh record per cell in one query
+        records = {}
+        fresh = WeatherData.query.filter(
+            WeatherData.grid_cell.in_(list(centers)),
+            WeatherData.fetched_at >= datetime.utcnow() - self.ttl
+        ).order_by(WeatherData.date.desc())
+        for record in fresh:
+            records.setdefault(record.grid_cell, record)
+        
+        missing = [grid_cell for grid_cell in centers if grid_cell not in records]
+        if missing:
+            agro_service = self.agro_service or AgromonitoringService()
+            results = run_concurrently(*[
+                partial(agro_service.get_weather, *centers[grid_cell]) for grid_cell in missing
+            ])
+            fetched = [
+                (grid_cell, *centers[grid_cell], weather_data)
+                for grid_cell, weather_data in zip(missing, results) if weather_data
+            ]
+            records.update(dict.fromkeys(missing))
+            records.update((record.grid_cell, record) for record in self.store(fetched))
+            db.session.commit()
+        return cells, records
+    
+    def store(self, fetched):
+        """
+        Write fetched weather for grid cells with one batched upsert
+        
+        Rows are keyed by grid cell and the observation time reported upstream, so fetching
+        an observation that is already stored only refreshes its fetched_at.
+        
+        Args:
+            fetched (list): (grid_cell, lat, lon, weather_data) tuples, where lat and lon are
+                the location the data was fetched for and weather_data the Agromonitoring response
+        
+        Returns:
+            list: The stored WeatherData records, in the order given
+        """
+        if not fetched:
+            return []
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'grid_cell': grid_cell,
+                'date': datetime.utcfromtimestamp(weather_data['dt']) if weather_data.get('dt') else now,
+                'lat': lat,
+                'lon': lon,
+                'temperature': weather_data.get('main', {}).get('temp'),
+                'rainfall': weather_data.get('rain', {}).get('1h', 0),
+                'forecast': weather_data,
+                'fetched_at': now
+            }
+            for grid_cell, lat, lon, weather_data in fetched
+        ]
+        upsert(WeatherData, rows, ['grid_cell', 'date'])
+        
+        keys = [(row['grid_cell'], row['date']) for row in rows]
+        # Refresh records already in the session, which the upsert bypassed
+        records = {
+            (record.grid_cell, record.date): record
+            for record in WeatherData.query.filter(
+                tuple_(WeatherData.grid_cell, WeatherData.date).in_(keys)
+            ).execution_options(populate_existing=True)
+        }
+        return [records[key] for key in keys]
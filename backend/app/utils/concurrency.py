@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_upstream_executor():
+    """
+    Get the shared thread pool used for concurrent upstream API calls
+    
+    Returns:
+        ThreadPoolExecutor: The process-wide executor
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['UPSTREAM_MAX_WORKERS'],
+                    thread_name_prefix='upstream'
+                )
+    return _executor
+
+def run_concurrently(*calls):
+    """
+    Run callables concurrently, each inside the current Flask app context
+    
+    Falls back to running them one after another when UPSTREAM_CONCURRENCY
+    is disabled.
+    
+    Args:
+        *calls: Zero-argument callables
+    
+    Returns:
+        list: Results in the same order as the callables
+    
+    Raises:
+        Exception: The first exception raised by any of the callables, once all have finished
+    """
+    if len(calls) < 2 or not current_app.config['UPSTREAM_CONCURRENCY']:
+        return [call() for call in calls]
+    
+    app = current_app._get_current_object()
+    
+    def run_in_app_context(call):
+        with app.app_context():
+            return call()
+    
+    executor = get_upstream_executor()
+    futures = [executor.submit(run_in_app_context, call) for call in calls]
+    
+    # Wait for every call so none is left running against a rolled back request
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
+
+def _reset_executor():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+# A forked worker inherits the pool without its threads, so submitted calls would never run
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
@@ -0,0 +1,92 @@
+import json
+import re
+import uuid
+from decimal import Decimal
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+class RawJSON:
+    """
+    Already-encoded JSON that is written into a response verbatim
+    
+    Used for geometry stored as GeoJSON text, which would otherwise be parsed
+    only to be encoded again straight away.
+    """
+    __slots__ = ('text',)
+    
+    def __init__(self, text):
+        self.text = text.encode('utf-8') if isinstance(text, str) else text
+    
+    def __repr__(self):
+        return f"RawJSON({self.text[:40]!r})"
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def get_backend():
+    """
+    Get the name of the JSON encoder in use
+    
+    Returns:
+        str: 'orjson' or 'json'
+    """
+    backend = current_app.config.get('JSON_ENCODER', 'auto')
+    if backend == 'json' or orjson is None:
+        return 'json'
+    return 'orjson'
+
+def dumps(data, indent=False):
+    """
+    Encode data as JSON bytes, splicing in any RawJSON values unchanged
+    
+    Args:
+        data: Data to encode
+        indent (bool): Pretty-print the output
+    
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    raw_values = []
+    nonce = uuid.uuid4().hex
+    
+    def default(value):
+        # Stand in a unique placeholder string, swapped for the raw text below
+        if isinstance(value, RawJSON):
+            raw_values.append(value.text)
+            return f"__raw_json_{nonce}_{len(raw_values) - 1}__"
+        return _default(value)
+    
+    if get_backend() == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        encoded = orjson.dumps(data, default=default, option=option)
+    else:
+        encoded = json.dumps(data, default=default, indent=2 if indent else None).encode('utf-8')
+    
+    if not raw_values:
+        return encoded
+    
+    placeholder = re.compile(rb'"__raw_json_' + nonce.encode() + rb'_(\d+)__"')
+    return placeholder.sub(lambda match: raw_values[int(match.group(1))], encoded)
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation that encodes responses with the fast encoder"""
+    dumped = dumps(data, indent=current_app.debug) + b"\n"
+    
+    resp = make_response(dumped, code)
+    resp.headers.extend(headers or {})
+    resp.mimetype = 'application/json'
+    return resp
@@ -1,5 +1,9 @@
+import re
 import traceback
-from datetime import datetime
+from datetime import datetime, timezone
+
+# NDVI values below the first threshold are Low health, below the second Medium, otherwise High
+NDVI_HEALTH_THRESHOLDS = (0.3, 0.6)
 
 def format_exception(exception):
     """
@@ -13,6 +17,36 @@ def format_exception(exception):
     """
     return f"{type(exception).__name__}: {str(exception)}"
 
+# The Agromonitoring API key travels as an appid query parameter
+_API_KEY_PARAM = re.compile(r'([?&])appid=[^&#\s\'"]*')
+
+def redact_api_key(text):
+    """
+    Hide Agromonitoring API keys in text that may contain request URLs, e.g. error messages
+    
+    Args:
+        text (str): Text to redact
+        
+    Returns:
+        str: Text with every appid value replaced
+    """
+    return _API_KEY_PARAM.sub(r'\1appid=REDACTED', text)
+
+def strip_api_key(url):
+    """
+    Remove the Agromonitoring API key from a URL before it is sent to a client
+    
+    Args:
+        url (str): Upstream URL, may be None
+        
+    Returns:
+        str: The URL without its appid parameter
+    """
+    if not isinstance(url, str):
+        return url
+    stripped = _API_KEY_PARAM.sub(lambda match: match.group(1), url)
+    return re.sub(r'[?&]$', '', stripped.replace('?&', '?').replace('&&', '&'))
+
 def format_datetime(dt):
     """
     Format a datetime object for API responses
@@ -45,6 +79,20 @@ def parse_datetime(dt_string):
         # Try different format if ISO format fails
         return datetime.strptime(dt_string, "%Y-%m-%d %H:%M:%S")
 
+def to_naive_utc(dt):
+    """
+    Convert a datetime to a naive UTC datetime for database comparisons
+    
+    Args:
+        dt (datetime): Naive (assumed UTC) or timezone-aware datetime
+        
+    Returns:
+        datetime: Naive datetime in UTC
+    """
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
 def get_ndvi_health_status(ndvi_value):
     """
     Convert NDVI value to health status label
@@ -58,9 +106,9 @@ def get_ndvi_health_status(ndvi_value):
     if ndvi_value is None:
         return "Unknown"
     
-    if ndvi_value < 0.3:
+    if ndvi_value < NDVI_HEALTH_THRESHOLDS[0]:
         return "Low"
-    elif ndvi_value < 0.6:
+    elif ndvi_value < NDVI_HEALTH_THRESHOLDS[1]:
         return "Medium"
     else:
         return "High" 
\ No newline at end of file
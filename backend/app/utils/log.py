@@ -0,0 +1,95 @@
+import json
+import logging
+
+# Defaults used when payloads are rendered outside an app context
+PAYLOAD_MAX_CHARS = 2000
+PAYLOAD_SAMPLE_ITEMS = 5
+
+def _sample(value, max_items):
+    if isinstance(value, dict):
+        return {key: _sample(item, max_items) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        sampled = [_sample(item, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            sampled.append(f"... {len(value) - max_items} more")
+        return sampled
+    return value
+
+class LazyJSON:
+    """
+    Log argument that renders a payload as compact JSON only when the record is emitted
+    
+    Large lists are cut down to their first few items and the output is truncated,
+    so a debug log line stays bounded whatever the payload size.
+    """
+    __slots__ = ('payload', 'max_chars', 'max_items')
+    
+    def __init__(self, payload, max_chars=None, max_items=None):
+        self.payload = payload
+        self.max_chars = max_chars or PAYLOAD_MAX_CHARS
+        self.max_items = max_items or PAYLOAD_SAMPLE_ITEMS
+    
+    def __str__(self):
+        try:
+            text = json.dumps(_sample(self.payload, self.max_items), default=str, separators=(',', ':'))
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if len(text) > self.max_chars:
+            text = f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+def lazy_json(payload):
+    """
+    Wrap a payload for logging with %s, deferring serialization until the record is emitted
+    
+    Args:
+        payload: JSON-serializable data
+    
+    Returns:
+        LazyJSON: Log argument
+    """
+    return LazyJSON(payload)
+
+def parse_log_levels(value):
+    """
+    Parse per-module log levels from a 'module=LEVEL,module=LEVEL' string
+    
+    Args:
+        value (str): Level specification
+    
+    Returns:
+        dict: Logger name to level name
+    
+    Raises:
+        ValueError: If an entry or level is malformed
+    """
+    levels = {}
+    for entry in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, sep, level = entry.partition('=')
+        level = level.strip().upper()
+        if not sep or not name.strip() or not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Invalid log level entry: {entry}")
+        levels[name.strip()] = level
+    return levels
+
+def configure_logging(app):
+    """
+    Apply the configured application and per-module log levels
+    
+    Module loggers created with logging.getLogger(__name__) are children of the
+    app logger, so they share its handler and can be tuned individually.
+    
+    Args:
+        app: Flask application
+    """
+    global PAYLOAD_MAX_CHARS, PAYLOAD_SAMPLE_ITEMS
+    PAYLOAD_MAX_CHARS = app.config['LOG_PAYLOAD_MAX_CHARS']
+    PAYLOAD_SAMPLE_ITEMS = app.config['LOG_PAYLOAD_SAMPLE_ITEMS']
+    
+    # Accessing app.logger installs Flask's default handler, which module loggers propagate to
+    app_logger = app.logger
+    if app.config.get('LOG_LEVEL'):
+        app_logger.setLevel(app.config['LOG_LEVEL'].upper())
+    
+    for name, level in parse_log_levels(app.config.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level)
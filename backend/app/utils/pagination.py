@@ -0,0 +1,65 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import tuple_
+
+def encode_cursor(created_at, id):
+    """
+    Encode a keyset position as an opaque cursor string
+    
+    Args:
+        created_at (datetime): Creation time of the last row on the page
+        id (UUID): ID of the last row on the page
+    
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by encode_cursor
+    
+    Args:
+        cursor (str): URL-safe cursor
+    
+    Returns:
+        tuple: (created_at, id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def paginate_keyset(query, created_at_column, id_column, limit, cursor=None):
+    """
+    Get one page of a query ordered by (created_at, id)
+    
+    Args:
+        query: SQLAlchemy query
+        created_at_column: Column holding the creation time
+        id_column: Column holding the unique ID
+        limit (int): Maximum number of rows
+        cursor (str, optional): Cursor returned with the previous page
+    
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) > tuple_(created_at, id))
+    
+    rows = query.order_by(created_at_column, id_column).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
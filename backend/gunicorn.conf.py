@@ -0,0 +1,77 @@
+"""
+Gunicorn settings for serving the API in production
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Request handlers spend most of their time waiting on the Agromonitoring API and
+the database, so the default gthread worker runs several threads per process.
+gevent is available for very high concurrency when the gevent package is installed.
+"""
+import multiprocessing
+import os
+
+# Run the app without the debugger and pretty-printed responses unless asked for
+os.environ.setdefault('FLASK_DEBUG', '0')
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5001)}")
+
+# 'gthread' (default), 'gevent' or 'sync'
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class == 'gevent':
+    # One process per core, each multiplexing many connections
+    default_workers = cpu_count
+elif worker_class == 'gthread':
+    # Threads cover the I/O waits, so a process per core plus one is enough
+    default_workers = cpu_count + 1
+else:
+    default_workers = cpu_count * 2 + 1
+
+workers = int(os.environ.get('WEB_CONCURRENCY') or default_workers)
+# Only gthread uses threads; gunicorn turns a sync worker with more than one thread into gthread
+threads = int(os.environ.get('GUNICORN_THREADS') or (8 if worker_class == 'gthread' else 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Load the app once in the master so workers fork with it already imported.
+# gevent must patch the standard library before the app is imported, so it loads per worker.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+
+# Keep connections from the frontend or a load balancer open between requests
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Upstream calls can wait on the rate limiter, so allow slow requests before killing a worker
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers now and then to bound memory growth, staggered so they do not restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Set up a worker forked from a master that preloaded the app"""
+    if not server.cfg.preload_app:
+        return
+
+    from app import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        # close=False leaves the master's sockets alone while the worker opens its own
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Start background threads once a worker has loaded the app"""
+    # Started per worker rather than on import, so the master and flask CLI commands do not;
+    # the ingestion lock lets one worker run a pass at a time
+    app = worker.wsgi
+    if app.config['NDVI_INGEST_WORKER']:
+        from app.services.ndvi_ingest import start_ingest_worker
+        start_ingest_worker(app)
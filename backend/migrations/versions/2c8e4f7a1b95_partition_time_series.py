@@ -0,0 +1,135 @@
+"""Monthly partitions for NDVI and weather history, weather summaries
+
+Revision ID: 2c8e4f7a1b95
+Revises: 9e6f1a2c7d40
+Create Date: 2026-10-17 20:41:08.312574
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8e4f7a1b95'
+down_revision = '9e6f1a2c7d40'
+branch_labels = None
+depends_on = None
+
+
+# Indexes recreated on the partitioned tables, which cascade them to every partition
+TABLE_INDEXES = {
+    'ndvi_history': [
+        'CREATE UNIQUE INDEX uq_ndvi_history_paddock_id_date '
+        'ON ndvi_history (paddock_id, date) INCLUDE (ndvi_value, clouds)',
+        'CREATE INDEX ix_ndvi_history_date_brin ON ndvi_history USING brin (date)',
+    ],
+    'weather_data': [
+        'CREATE INDEX ix_weather_data_grid_cell_date ON weather_data (grid_cell, date)',
+        'CREATE INDEX ix_weather_data_date_brin ON weather_data USING brin (date)',
+    ],
+}
+
+TABLE_FOREIGN_KEYS = {
+    'ndvi_history': ['FOREIGN KEY (paddock_id) REFERENCES paddocks (id)'],
+    'weather_data': [],
+}
+
+# Months created ahead of the current one; the app tops these up at startup
+MONTHS_AHEAD = 3
+
+LEGACY_INDEXES = {
+    'ndvi_history': ['uq_ndvi_history_paddock_id_date', 'ix_ndvi_history_paddock_id_date', 'ix_ndvi_history_date_brin'],
+    'weather_data': ['ix_weather_data_grid_cell_date', 'ix_weather_data_date_brin'],
+}
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def is_partitioned(bind, table):
+    return bind.execute(sa.text(
+        'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))'
+    ), {'table': table}).scalar()
+
+
+def create_partitions(table, first, last):
+    """Create a default partition and one partition per month from first to last"""
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    month = month_start(first)
+    while month <= last:
+        following = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{following:%Y-%m-%d}')"
+        )
+        month = following
+
+
+def rebuild_table(table, partitioned):
+    """Copy a table into a new partitioned or plain table of the same name"""
+    legacy = f'{table}_unpartitioned' if partitioned else f'{table}_partitioned'
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+    for index in LEGACY_INDEXES[table]:
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+
+    # A partitioned table's primary key has to include the partition key
+    partition_by = ' PARTITION BY RANGE (date)' if partitioned else ''
+    primary_key = '(id, date)' if partitioned else '(id)'
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS){partition_by}')
+    op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY {primary_key}')
+    for foreign_key in TABLE_FOREIGN_KEYS[table]:
+        op.execute(f'ALTER TABLE {table} ADD {foreign_key}')
+    for index in TABLE_INDEXES[table]:
+        op.execute(index)
+
+    if partitioned:
+        # Partitions for every month already holding data, up to the months created ahead
+        bind = op.get_bind()
+        first, last = bind.execute(sa.text(f'SELECT min(date), max(date) FROM {legacy}')).one()
+        this_month = month_start(datetime.utcnow())
+        ahead = add_months(this_month, MONTHS_AHEAD)
+        create_partitions(table, min(first or this_month, this_month), max(last or ahead, ahead))
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table in ('ndvi_history', 'weather_data'):
+        if not is_partitioned(bind, table):
+            rebuild_table(table, partitioned=True)
+
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS weather_summaries ('
+        'grid_cell VARCHAR(64) NOT NULL, '
+        'period VARCHAR(8) NOT NULL, '
+        'period_start TIMESTAMP WITHOUT TIME ZONE NOT NULL, '
+        'lat DOUBLE PRECISION, '
+        'lon DOUBLE PRECISION, '
+        'temperature_mean DOUBLE PRECISION, '
+        'temperature_min DOUBLE PRECISION, '
+        'temperature_max DOUBLE PRECISION, '
+        'rainfall_mean DOUBLE PRECISION, '
+        'rainfall_max DOUBLE PRECISION, '
+        'observations INTEGER NOT NULL, '
+        'PRIMARY KEY (grid_cell, period, period_start))'
+    )
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS weather_summaries')
+
+    bind = op.get_bind()
+    for table in ('weather_data', 'ndvi_history'):
+        if is_partitioned(bind, table):
+            rebuild_table(table, partitioned=False)
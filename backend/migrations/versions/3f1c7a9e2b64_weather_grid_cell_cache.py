@@ -0,0 +1,33 @@
+"""Weather grid cell cache
+
+Revision ID: 3f1c7a9e2b64
+Revises: 88bece450b54
+Create Date: 2026-10-17 11:40:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c7a9e2b64'
+down_revision = '88bece450b54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS grid_cell VARCHAR(64)')
+    op.execute('ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION')
+    op.execute('ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS lon DOUBLE PRECISION')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_weather_data_grid_cell_date '
+        'ON weather_data (grid_cell, date)'
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_weather_data_grid_cell_date')
+    op.execute('ALTER TABLE weather_data DROP COLUMN IF EXISTS lon')
+    op.execute('ALTER TABLE weather_data DROP COLUMN IF EXISTS lat')
+    op.execute('ALTER TABLE weather_data DROP COLUMN IF EXISTS grid_cell')
@@ -0,0 +1,24 @@
+"""NDVI history (paddock_id, date) index
+
+Revision ID: 5b0d3e8f6a21
+Revises: a4e27c9d1b83
+Create Date: 2026-10-17 18:12:44.903517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0d3e8f6a21'
+down_revision = 'a4e27c9d1b83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_ndvi_history_paddock_id_date ON ndvi_history (paddock_id, date)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_ndvi_history_paddock_id_date')
@@ -0,0 +1,40 @@
+"""Unique weather readings per grid cell and date
+
+Revision ID: 6f3b9d2e8a17
+Revises: 2c8e4f7a1b95
+Create Date: 2026-10-17 21:26:44.905613
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f3b9d2e8a17'
+down_revision = '2c8e4f7a1b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the newest row per grid cell and reading date
+    op.execute(
+        'DELETE FROM weather_data WHERE (id, date) IN ('
+        'SELECT id, date FROM ('
+        'SELECT id, date, row_number() OVER ('
+        'PARTITION BY grid_cell, date ORDER BY created_at DESC, id'
+        ') AS rank FROM weather_data WHERE grid_cell IS NOT NULL'
+        ') ranked WHERE rank > 1)'
+    )
+
+    # Unique so fetched weather can be written with ON CONFLICT
+    op.execute(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_weather_data_grid_cell_date '
+        'ON weather_data (grid_cell, date)'
+    )
+    op.execute('DROP INDEX IF EXISTS ix_weather_data_grid_cell_date')
+
+
+def downgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_weather_data_grid_cell_date ON weather_data (grid_cell, date)')
+    op.execute('DROP INDEX IF EXISTS uq_weather_data_grid_cell_date')
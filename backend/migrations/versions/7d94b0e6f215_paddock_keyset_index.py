@@ -0,0 +1,24 @@
+"""Paddock keyset pagination index
+
+Revision ID: 7d94b0e6f215
+Revises: c52e08d1a7f3
+Create Date: 2026-10-17 14:21:37.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d94b0e6f215'
+down_revision = 'c52e08d1a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_paddocks_created_at_id ON paddocks (created_at, id)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_paddocks_created_at_id')
@@ -0,0 +1,57 @@
+"""NDVI scene cache
+
+Revision ID: 88bece450b54
+Revises: d9c893504d38
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '88bece450b54'
+down_revision = 'd9c893504d38'
+branch_labels = None
+depends_on = None
+
+
+# The app runs db.create_all() on startup, so columns may already exist on
+# a fresh database by the time this migration runs.
+NDVI_HISTORY_COLUMNS = [
+    ('satellite', 'VARCHAR(64)'),
+    ('clouds', 'DOUBLE PRECISION'),
+    ('coverage', 'DOUBLE PRECISION'),
+    ('sun', 'JSON'),
+    ('image_urls', 'JSON'),
+    ('ndvi_min', 'DOUBLE PRECISION'),
+    ('ndvi_max', 'DOUBLE PRECISION'),
+    ('ndvi_median', 'DOUBLE PRECISION'),
+    ('ndvi_std', 'DOUBLE PRECISION'),
+    ('statistics', 'JSON'),
+]
+
+PADDOCK_COLUMNS = [
+    ('ndvi_synced_from', 'TIMESTAMP WITHOUT TIME ZONE'),
+    ('ndvi_synced_until', 'TIMESTAMP WITHOUT TIME ZONE'),
+    ('ndvi_checked_at', 'TIMESTAMP WITHOUT TIME ZONE'),
+]
+
+
+def upgrade():
+    for name, type_ in NDVI_HISTORY_COLUMNS:
+        op.execute(f'ALTER TABLE ndvi_history ADD COLUMN IF NOT EXISTS {name} {type_}')
+    op.execute('ALTER TABLE ndvi_history ALTER COLUMN ndvi_value DROP NOT NULL')
+
+    for name, type_ in PADDOCK_COLUMNS:
+        op.execute(f'ALTER TABLE paddocks ADD COLUMN IF NOT EXISTS {name} {type_}')
+
+
+def downgrade():
+    for name, _ in PADDOCK_COLUMNS:
+        op.execute(f'ALTER TABLE paddocks DROP COLUMN IF EXISTS {name}')
+
+    op.execute('DELETE FROM ndvi_history WHERE ndvi_value IS NULL')
+    op.execute('ALTER TABLE ndvi_history ALTER COLUMN ndvi_value SET NOT NULL')
+    for name, _ in NDVI_HISTORY_COLUMNS:
+        op.execute(f'ALTER TABLE ndvi_history DROP COLUMN IF EXISTS {name}')
@@ -0,0 +1,31 @@
+"""Weather readings keyed by observation time with a separate fetch time
+
+Revision ID: 8c1d5e3f9b20
+Revises: 6f3b9d2e8a17
+Create Date: 2026-10-17 23:12:05.418730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d5e3f9b20'
+down_revision = '6f3b9d2e8a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMP WITHOUT TIME ZONE')
+
+    # Existing rows were dated when they were fetched. Only rows young enough to still be
+    # served from the cache need the fetch time, so older ones are left NULL
+    op.execute(
+        "UPDATE weather_data SET fetched_at = date "
+        "WHERE fetched_at IS NULL AND date >= now() AT TIME ZONE 'utc' - interval '1 day'"
+    )
+
+
+def downgrade():
+    op.execute('ALTER TABLE weather_data DROP COLUMN IF EXISTS fetched_at')
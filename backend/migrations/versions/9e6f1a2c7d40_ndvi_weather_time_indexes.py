@@ -0,0 +1,48 @@
+"""NDVI history uniqueness and time column indexes
+
+Revision ID: 9e6f1a2c7d40
+Revises: 5b0d3e8f6a21
+Create Date: 2026-10-17 19:03:27.551208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e6f1a2c7d40'
+down_revision = '5b0d3e8f6a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep one row per paddock and scene date, preferring rows with statistics
+    op.execute(
+        'DELETE FROM ndvi_history WHERE id IN ('
+        'SELECT id FROM ('
+        'SELECT id, row_number() OVER ('
+        'PARTITION BY paddock_id, date '
+        'ORDER BY ndvi_value IS NOT NULL DESC, statistics IS NOT NULL DESC, created_at DESC, id'
+        ') AS rank FROM ndvi_history'
+        ') ranked WHERE rank > 1)'
+    )
+
+    # Unique so scene upserts can use ON CONFLICT, and covering so the summary and
+    # analytics queries can be answered from the index alone
+    op.execute(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_ndvi_history_paddock_id_date '
+        'ON ndvi_history (paddock_id, date) INCLUDE (ndvi_value, clouds)'
+    )
+    op.execute('DROP INDEX IF EXISTS ix_ndvi_history_paddock_id_date')
+
+    # BRIN indexes stay a few pages in size while narrowing time-range scans
+    op.execute('CREATE INDEX IF NOT EXISTS ix_ndvi_history_date_brin ON ndvi_history USING brin (date)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_weather_data_date_brin ON weather_data USING brin (date)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_weather_data_date_brin')
+    op.execute('DROP INDEX IF EXISTS ix_ndvi_history_date_brin')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_ndvi_history_paddock_id_date ON ndvi_history (paddock_id, date)')
+    op.execute('DROP INDEX IF EXISTS uq_ndvi_history_paddock_id_date')
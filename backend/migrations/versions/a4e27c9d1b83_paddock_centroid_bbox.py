@@ -0,0 +1,46 @@
+"""Paddock centroid and bounding box columns
+
+Revision ID: a4e27c9d1b83
+Revises: e813a5c40d9b
+Create Date: 2026-10-17 16:48:03.215774
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e27c9d1b83'
+down_revision = 'e813a5c40d9b'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ('centroid_lat', 'centroid_lon', 'min_lon', 'min_lat', 'max_lon', 'max_lat')
+
+
+def upgrade():
+    for column in COLUMNS:
+        op.execute(f'ALTER TABLE paddocks ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION')
+
+    # Backfill from the PostGIS geometry; ST_Centroid is planar like shapely's centroid
+    op.execute(
+        'UPDATE paddocks SET '
+        'centroid_lat = ST_Y(ST_Centroid(geometry)), '
+        'centroid_lon = ST_X(ST_Centroid(geometry)), '
+        'min_lon = ST_XMin(geometry), '
+        'min_lat = ST_YMin(geometry), '
+        'max_lon = ST_XMax(geometry), '
+        'max_lat = ST_YMax(geometry) '
+        'WHERE centroid_lat IS NULL OR min_lon IS NULL'
+    )
+
+    op.execute('CREATE INDEX IF NOT EXISTS ix_paddocks_centroid ON paddocks (centroid_lat, centroid_lon)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_paddocks_bbox ON paddocks (min_lon, max_lon, min_lat, max_lat)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_paddocks_bbox')
+    op.execute('DROP INDEX IF EXISTS ix_paddocks_centroid')
+    for column in reversed(COLUMNS):
+        op.execute(f'ALTER TABLE paddocks DROP COLUMN IF EXISTS {column}')
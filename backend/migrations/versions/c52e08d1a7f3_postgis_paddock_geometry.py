@@ -0,0 +1,47 @@
+"""PostGIS paddock geometry
+
+Revision ID: c52e08d1a7f3
+Revises: 3f1c7a9e2b64
+Create Date: 2026-10-17 13:05:51.447930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e08d1a7f3'
+down_revision = '3f1c7a9e2b64'
+branch_labels = None
+depends_on = None
+
+
+def get_geometry_udt():
+    bind = op.get_bind()
+    return bind.execute(sa.text(
+        "SELECT udt_name FROM information_schema.columns "
+        "WHERE table_name = 'paddocks' AND column_name = 'geometry'"
+    )).scalar()
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+
+    # Convert the GeoJSON text in place, which also backfills existing rows
+    if get_geometry_udt() != 'geometry':
+        op.execute(
+            'ALTER TABLE paddocks ALTER COLUMN geometry TYPE geometry(POLYGON, 4326) '
+            'USING ST_SetSRID(ST_Force2D(ST_GeomFromGeoJSON(geometry)), 4326)'
+        )
+
+    op.execute('CREATE INDEX IF NOT EXISTS ix_paddocks_geometry ON paddocks USING gist (geometry)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_paddocks_geometry')
+
+    if get_geometry_udt() == 'geometry':
+        op.execute(
+            'ALTER TABLE paddocks ALTER COLUMN geometry TYPE TEXT '
+            'USING ST_AsGeoJSON(geometry)'
+        )
@@ -0,0 +1,46 @@
+"""Paddock geometry levels of detail
+
+Revision ID: e813a5c40d9b
+Revises: 7d94b0e6f215
+Create Date: 2026-10-17 15:02:19.664081
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e813a5c40d9b'
+down_revision = '7d94b0e6f215'
+branch_labels = None
+depends_on = None
+
+
+# GEOMETRY_LOD_TOLERANCES defaults when this revision was written, in degrees, finest first
+TOLERANCES = [0.00005, 0.0002, 0.001, 0.005]
+
+
+def upgrade():
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS paddock_geometry_levels ('
+        'paddock_id UUID NOT NULL REFERENCES paddocks (id) ON DELETE CASCADE, '
+        'level INTEGER NOT NULL, '
+        'tolerance DOUBLE PRECISION NOT NULL, '
+        'geometry TEXT NOT NULL, '
+        'vertex_count INTEGER NOT NULL, '
+        'PRIMARY KEY (paddock_id, level))'
+    )
+
+    # Backfill simplified geometries for existing paddocks. PostGIS simplifies with the same
+    # GEOS topology-preserving simplifier the app uses for new and edited paddocks
+    levels = ', '.join(f'({level}, {tolerance!r})' for level, tolerance in enumerate(TOLERANCES, start=1))
+    op.execute(
+        'INSERT INTO paddock_geometry_levels (paddock_id, level, tolerance, geometry, vertex_count) '
+        'SELECT p.id, t.level, t.tolerance, ST_AsGeoJSON(s.geometry), ST_NPoints(s.geometry) '
+        f'FROM paddocks p CROSS JOIN (VALUES {levels}) AS t (level, tolerance) '
+        'CROSS JOIN LATERAL (SELECT ST_SimplifyPreserveTopology(p.geometry, t.tolerance) AS geometry) s '
+        'WHERE NOT EXISTS (SELECT 1 FROM paddock_geometry_levels l WHERE l.paddock_id = p.id)'
+    )
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS paddock_geometry_levels')
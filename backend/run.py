@@ -1,3 +1,4 @@
+import os
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -6,4 +7,11 @@ from app import create_app
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True) 
\ No newline at end of file
+    # Optionally keep NDVI data fresh in the background. Started only when serving, so
+    # flask CLI commands importing this module do not; gunicorn starts it per worker.
+    # Under the reloader only the child process that serves requests starts it.
+    if app.config['NDVI_INGEST_WORKER'] and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        from app.services.ndvi_ingest import start_ingest_worker
+        start_ingest_worker(app)
+    
+    app.run(host=app.config['HOST'], port=app.config['PORT'], debug=app.config['DEBUG']) 
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Load test the API and compare the development server with gunicorn
+
+Benchmark a running server:
+
+    python scripts/benchmark_server.py --url http://localhost:5001/api/paddocks?limit=50
+
+Start each server in turn and compare them:
+
+    python scripts/benchmark_server.py --compare --path /api/paddocks?limit=50
+
+Both servers load run.py with the environment of this process, so it needs the
+same database and API settings as the app.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'flask': [sys.executable, 'run.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+}
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def run_load(url, concurrency, duration, warmup=2.0):
+    """
+    Send requests to a URL from several threads for a fixed time
+    
+    Each thread keeps one connection alive, like a browser or load balancer would.
+    
+    Args:
+        url (str): URL to request
+        concurrency (int): Concurrent clients
+        duration (float): Seconds to measure for
+        warmup (float): Seconds of load before measuring starts
+    
+    Returns:
+        dict: Request count, errors, requests per second and latency percentiles in ms
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = time.perf_counter() + warmup
+    stop = start + duration
+    
+    def client():
+        session = requests.Session()
+        while True:
+            sent = time.perf_counter()
+            if sent >= stop:
+                return
+            try:
+                ok = session.get(url, timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - sent
+            if sent < start:
+                continue
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / duration,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+    }
+
+def wait_until_ready(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}, start it by hand to see the error")
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server did not answer {url} within {timeout}s")
+
+def benchmark_server(name, path, port, concurrency, duration):
+    """
+    Start a server, load test it and shut it down
+    
+    Args:
+        name (str): 'flask' or 'gunicorn'
+        path (str): Path to request, including any query string
+        port (int): Port to serve on
+        concurrency (int): Concurrent clients
+        duration (float): Seconds to measure for
+    
+    Returns:
+        dict: Results from run_load
+    """
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', FLASK_DEBUG='0', GUNICORN_ACCESS_LOG='')
+    process = subprocess.Popen(
+        SERVERS[name], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        wait_until_ready(url, process)
+        return run_load(url, concurrency, duration)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def print_results(name, results):
+    print(
+        f"{name:<10} {results['rps']:>9.1f} req/s  p50 {results['p50']:>7.1f} ms  "
+        f"p95 {results['p95']:>7.1f} ms  p99 {results['p99']:>7.1f} ms  "
+        f"({results['requests']} ok, {results['errors']} errors)"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Benchmark an already running server at this URL')
+    parser.add_argument('--compare', action='store_true', help='Start the Flask dev server and gunicorn in turn and compare them')
+    parser.add_argument('--path', default='/api/paddocks?limit=50', help='Path requested with --compare')
+    parser.add_argument('--port', type=int, default=5101, help='Port used with --compare')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds to measure for')
+    args = parser.parse_args()
+    
+    if args.compare:
+        results = {}
+        for name in SERVERS:
+            results[name] = benchmark_server(name, args.path, args.port, args.concurrency, args.duration)
+            print_results(name, results[name])
+        if results['flask']['rps']:
+            print(f"gunicorn throughput: {results['gunicorn']['rps'] / results['flask']['rps']:.2f}x the dev server")
+    elif args.url:
+        print_results('server', run_load(args.url, args.concurrency, args.duration))
+    else:
+        parser.error('pass --url or --compare')
+
+if __name__ == '__main__':
+    main()
@@ -83,6 +83,34 @@ const MapboxMap = forwardRef<MapboxMapRef, MapboxMapProps>(({
       // Wait for the map to load
       map.on('load', () => {
         console.log("Map loaded successfully");
+        
+        // Paddock boundaries are served as vector tiles so only the visible area is loaded
+        map.addSource('paddocks', {
+          type: 'vector',
+          tiles: [`${process.env.NEXT_PUBLIC_API_URL}/api/paddocks/tiles/{z}/{x}/{y}.mvt`],
+          maxzoom: 16
+        });
+        map.addLayer({
+          id: 'paddocks-fill',
+          type: 'fill',
+          source: 'paddocks',
+          'source-layer': 'paddocks',
+          paint: {
+            'fill-color': '#4ade80',
+            'fill-opacity': 0.25
+          }
+        });
+        map.addLayer({
+          id: 'paddocks-outline',
+          type: 'line',
+          source: 'paddocks',
+          'source-layer': 'paddocks',
+          paint: {
+            'line-color': '#22c55e',
+            'line-width': 2
+          }
+        });
+        
         setMapInitialized(true);
       });
 